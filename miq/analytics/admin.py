@@ -14,14 +14,14 @@ admin.site.register(Hit, HitModelAdmin)
 
 
 class SearchTermModelAdmin(admin.ModelAdmin):
-    list_display = ('value', 'count', 'session', 'slug',)
+    list_display = ('value', 'site_id', 'day', 'count', 'slug',)
 
 
 admin.site.register(SearchTerm, SearchTermModelAdmin)
 
 
 class CampaignModelAdmin(admin.ModelAdmin):
-    list_display = ('key', 'value', 'ip', 'slug',)
+    list_display = ('key', 'value', 'site_id', 'day', 'count', 'slug',)
 
 
 admin.site.register(Campaign, CampaignModelAdmin)
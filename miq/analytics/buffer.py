@@ -0,0 +1,175 @@
+"""
+HIT RECORDING
+
+Hits are built during the request, and written by the configured recorder.
+
+settings.MIQ_HIT_RECORDER:
+- 'miq.analytics.buffer.BufferedRecorder' (default): hits are queued in
+  process, and a background thread saves them with bulk_create every
+  MIQ_HIT_BUFFER_SIZE hits (default 100) or MIQ_HIT_BUFFER_INTERVAL
+  milliseconds (default 1000). At most MIQ_HIT_BUFFER_MAX hits
+  (default 10000) are queued, later hits are dropped and counted.
+- 'miq.analytics.buffer.SyncRecorder': hits are saved in the request
+"""
+
+import os
+import atexit
+import queue
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+from .utils import write_hits
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RECORDER = 'miq.analytics.buffer.BufferedRecorder'
+
+_recorders = {}
+
+
+class HitBuffer:
+    """
+    Bounded queue of hit entries, flushed by a daemon thread
+    """
+
+    def __init__(self, size: int = 100, interval: int = 1000, max_size: int = 10000):
+        self.size = size
+        self.interval = interval / 1000
+        self.max_size = max_size
+
+        self.dropped = 0
+        self.flushed = 0
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._queue = queue.Queue(maxsize=max_size)
+
+    def put(self, entry) -> bool:
+        self.start()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+        if self._queue.qsize() >= self.size:
+            self._wake.set()
+        return True
+
+    def start(self):
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            # Forked workers do not inherit the parent's thread
+            if self._pid is not None:
+                self._queue = queue.Queue(maxsize=self.max_size)
+
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self.run, name='miq-hits', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+    def drain(self) -> list:
+        entries = []
+        while True:
+            try:
+                entries.append(self._queue.get_nowait())
+            except queue.Empty:
+                return entries
+
+    def flush(self) -> int:
+        """
+        Saves the queued hits, returns how many were saved
+        """
+
+        with self._flush_lock:
+            entries = self.drain()
+            if not entries:
+                return 0
+
+            try:
+                write_hits(entries)
+            except Exception:
+                logger.exception(f'Cannot save {len(entries)} hits')
+                with self._lock:
+                    self.dropped += len(entries)
+                return 0
+
+            with self._lock:
+                self.flushed += len(entries)
+            return len(entries)
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        self._wake.set()
+        if self._thread and self._pid == os.getpid():
+            self._thread.join(timeout)
+        self._pid = None
+        self.flush()
+
+    def stats(self) -> dict:
+        return {
+            'queued': self._queue.qsize(),
+            'flushed': self.flushed,
+            'dropped': self.dropped,
+        }
+
+
+class BaseRecorder:
+    def record(self, entry):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+
+class SyncRecorder(BaseRecorder):
+    def record(self, entry):
+        write_hits([entry])
+
+
+class BufferedRecorder(BaseRecorder):
+    def __init__(self):
+        self.buffer = HitBuffer(
+            size=getattr(settings, 'MIQ_HIT_BUFFER_SIZE', 100),
+            interval=getattr(settings, 'MIQ_HIT_BUFFER_INTERVAL', 1000),
+            max_size=getattr(settings, 'MIQ_HIT_BUFFER_MAX', 10000))
+        atexit.register(self.buffer.stop)
+
+    def record(self, entry):
+        if not self.buffer.put(entry) and self.buffer.dropped % 1000 == 1:
+            logger.warning(f'Hit buffer full, {self.buffer.dropped} hits dropped')
+
+    def flush(self):
+        return self.buffer.flush()
+
+
+def get_hit_recorder() -> BaseRecorder:
+    path = getattr(settings, 'MIQ_HIT_RECORDER', DEFAULT_RECORDER)
+    if path not in _recorders:
+        _recorders[path] = import_string(path)()
+    return _recorders[path]
@@ -0,0 +1,83 @@
+"""
+HIT CLASSIFIER
+
+Hits are classified once, when they are written:
+- is_bot: crawlers, scripts and monitoring agents
+- traffic_source: social, search, referral or direct
+- ua_family: browser, app or crawler name
+
+User agents and referrers repeat a lot, results are cached.
+"""
+
+import re
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+from .models import TrafficSource
+
+BOT_RE = re.compile(
+    r'bot|crawl|spider|slurp|scrap|fetch|monitor|preview|headless|lighthouse'
+    r'|curl|wget|python|java/|go-http|okhttp|axios|node-fetch|libwww|httpclient')
+
+# First match wins, in-app browsers and crawlers before browsers
+UA_FAMILIES = tuple((family, re.compile(pattern)) for family, pattern in (
+    ('googlebot', r'googlebot|google-inspectiontool'),
+    ('bingbot', r'bingbot|bingpreview'),
+    ('facebookbot', r'facebookexternalhit|facebookcatalog'),
+    ('instagram', r'instagram'),
+    ('facebook', r'fban|fbav|fb_iab'),
+    ('tiktok', r'tiktok|musical_ly|bytedance'),
+    ('edge', r'edg(e|a|ios)?/'),
+    ('opera', r'opr/|opera'),
+    ('samsung', r'samsungbrowser'),
+    ('firefox', r'firefox|fxios'),
+    ('chrome', r'chrome|crios|chromium'),
+    ('safari', r'safari'),
+    ('curl', r'curl'),
+    ('python', r'python'),
+))
+
+SOCIAL_RE = re.compile(
+    r'instagram|facebook|fb\.|fban|fbav|t\.co$|twitter|x\.com$|linkedin|lnkd\.in'
+    r'|pinterest|tiktok|reddit|youtube|snapchat|whatsapp|telegram')
+
+SEARCH_RE = re.compile(
+    r'(^|\.)(google|bing|yahoo|duckduckgo|baidu|yandex|ecosia|qwant|startpage|search\.brave)\.')
+
+
+@lru_cache(maxsize=4096)
+def classify_user_agent(user_agent: str) -> tuple:
+    """
+    Returns (is_bot, family)
+    """
+
+    user_agent = (user_agent or '').lower()
+    if not user_agent:
+        return True, ''
+
+    family = next((name for name, regex in UA_FAMILIES if regex.search(user_agent)), 'other')
+    return bool(BOT_RE.search(user_agent)), family
+
+
+@lru_cache(maxsize=4096)
+def classify_referrer(referrer: str, host: str = '', user_agent_family: str = '') -> str:
+    referrer_host = urlsplit((referrer or '').lower()).hostname or ''
+    if user_agent_family in ('instagram', 'facebook', 'tiktok'):
+        return TrafficSource.SOCIAL
+    if not referrer_host or referrer_host == (host or '').lower():
+        return TrafficSource.DIRECT
+    if SOCIAL_RE.search(referrer_host):
+        return TrafficSource.SOCIAL
+    if SEARCH_RE.search(referrer_host):
+        return TrafficSource.SEARCH
+    return TrafficSource.REFERRAL
+
+
+def classify(*, path: str = '', url: str = '', referrer: str = None, user_agent: str = None) -> dict:
+    is_bot, family = classify_user_agent(user_agent)
+    return {
+        # Paths with 'bot' were counted as bots before classification
+        'is_bot': is_bot or 'bot' in (path or '').lower(),
+        'ua_family': family,
+        'traffic_source': classify_referrer(referrer, urlsplit(url or '').hostname, family),
+    }
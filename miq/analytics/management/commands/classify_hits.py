@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from miq.analytics.models import Hit
+
+FIELDS = ('is_bot', 'traffic_source', 'ua_family')
+
+
+class Command(BaseCommand):
+    help = 'Classify stored hits (bot flag, traffic source, user agent family)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        qs = Hit.objects.only('pk', 'path', 'url', 'referrer', 'user_agent', *FIELDS).order_by('pk')
+        batch = []
+        count = 0
+        for hit in qs.iterator(chunk_size=batch_size):
+            before = [getattr(hit, field) for field in FIELDS]
+            hit.classify()
+            if before == [getattr(hit, field) for field in FIELDS]:
+                continue
+
+            batch.append(hit)
+            if len(batch) >= batch_size:
+                count += len(batch)
+                Hit.objects.bulk_update(batch, FIELDS)
+                batch = []
+
+        if batch:
+            count += len(batch)
+            Hit.objects.bulk_update(batch, FIELDS)
+
+        self.stdout.write(f'Hits: {count} updated')
+        self.stdout.write(self.style.SUCCESS('Done, rebuild the rollups with `rollup_hits --since`'))
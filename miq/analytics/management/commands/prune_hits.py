@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from miq.analytics.models import Hit
+from miq.analytics.retention import get_retention_days, get_retention_cutoff
+from miq.analytics.retention import prune_hits, rollup_expired_days
+
+
+class Command(BaseCommand):
+    help = 'Roll up, archive and delete the hits older than the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Days kept, settings.MIQ_HIT_RETENTION_DAYS by default')
+        parser.add_argument('--archive-dir', help='settings.MIQ_HIT_ARCHIVE_DIR by default')
+        parser.add_argument('--no-archive', action='store_true', help='Delete without archiving')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--pause', type=float, default=0, help='Seconds between batches')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        days = options['days'] or get_retention_days()
+        if days < 1:
+            raise CommandError('Keep at least one day')
+
+        archive_dir = None
+        if not options['no_archive']:
+            archive_dir = options['archive_dir'] or getattr(settings, 'MIQ_HIT_ARCHIVE_DIR', None)
+            if not archive_dir:
+                raise CommandError('Set MIQ_HIT_ARCHIVE_DIR, --archive-dir or --no-archive')
+
+        cutoff = get_retention_cutoff(days)
+        if options['dry_run']:
+            count = Hit.objects.filter(created__lt=cutoff).count()
+            self.stdout.write(f'{count} hits created before {cutoff:%Y-%m-%d} would be deleted')
+            return
+
+        rolled = rollup_expired_days(cutoff)
+        self.stdout.write(f'{len(rolled)} days rolled up')
+
+        deleted = prune_hits(
+            cutoff=cutoff, archive_dir=archive_dir,
+            batch_size=options['batch_size'], pause=options['pause'],
+            log=self.stdout.write if options['verbosity'] > 1 else None)
+
+        self.stdout.write(self.style.SUCCESS(f'{deleted} hits deleted'))
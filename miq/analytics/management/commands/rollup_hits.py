@@ -0,0 +1,22 @@
+from datetime import date, timedelta
+
+from django.utils import timezone
+from django.core.management.base import BaseCommand
+
+from miq.analytics.rollups import rollup_hits
+
+
+class Command(BaseCommand):
+    help = 'Update the hourly and daily hit rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=date.fromisoformat, help='First day to rebuild, YYYY-MM-DD')
+        parser.add_argument('--days', type=int, help='Rebuild the last n days')
+
+    def handle(self, *args, **options):
+        since = options['since']
+        if options['days']:
+            since = timezone.localdate() - timedelta(days=options['days'] - 1)
+
+        days = rollup_hits(since)
+        self.stdout.write(self.style.SUCCESS(f'{len(days)} days rolled up'))
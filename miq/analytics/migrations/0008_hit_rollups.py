@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0007_alter_campaign_options_campaign_is_pinned'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyHitRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('site_id', models.CharField(max_length=500)),
+                ('path', models.TextField(max_length=500)),
+                ('response_status', models.PositiveIntegerField(blank=True, null=True)),
+                ('is_bot', models.BooleanField(default=False)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('sessions', models.PositiveIntegerField(default=0)),
+                ('day', models.DateField(db_index=True, verbose_name='Day')),
+            ],
+            options={
+                'verbose_name': 'Daily hits',
+                'verbose_name_plural': 'Daily hits',
+                'ordering': ('-day',),
+                'indexes': [models.Index(fields=['site_id', 'day'], name='analytics_d_site_id_dfbacf_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='HitRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('site_id', models.CharField(max_length=500)),
+                ('path', models.TextField(max_length=500)),
+                ('response_status', models.PositiveIntegerField(blank=True, null=True)),
+                ('is_bot', models.BooleanField(default=False)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('sessions', models.PositiveIntegerField(default=0)),
+                ('hour', models.DateTimeField(db_index=True, verbose_name='Hour')),
+            ],
+            options={
+                'verbose_name': 'Hourly hits',
+                'verbose_name_plural': 'Hourly hits',
+                'ordering': ('-hour',),
+                'indexes': [models.Index(fields=['site_id', 'hour'], name='analytics_h_site_id_2d69d3_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0008_hit_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hit',
+            name='is_bot',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='Is bot'),
+        ),
+        migrations.AddField(
+            model_name='hit',
+            name='traffic_source',
+            field=models.CharField(choices=[('social', 'Social'), ('search', 'Search'), ('referral', 'Referral'), ('direct', 'Direct')], db_index=True, default='direct', max_length=20, verbose_name='Traffic source'),
+        ),
+        migrations.AddField(
+            model_name='hit',
+            name='ua_family',
+            field=models.CharField(blank=True, default='', max_length=50, verbose_name='User agent family'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0009_hit_classification'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hit',
+            index=models.Index(fields=['-created'], name='hit_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hit',
+            index=models.Index(fields=['site_id', '-created'], name='hit_site_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hit',
+            index=models.Index(condition=models.Q(('is_bot', False)), fields=['-created'], name='hit_human_created_idx'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:12
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+
+def merge_daily_counts(apps, schema_editor):
+    """
+    Sets the day of existing rows and merges the rows
+    of the same (site, key, value, day) into one count
+    """
+
+    for name, fields in (
+            ('Campaign', ('site_id', 'key', 'value', 'day')),
+            ('SearchTerm', ('site_id', 'value', 'day'))):
+        model = apps.get_model('analytics', name)
+        model.objects.update(day=TruncDate('created'))
+
+        groups = model.objects.values(*fields)\
+            .annotate(rows=models.Count('id'), total=models.Sum('count'), keep=models.Min('id'))\
+            .filter(rows__gt=1)
+        for group in groups:
+            model.objects.filter(pk=group['keep']).update(count=group['total'])
+            model.objects.filter(**{field: group[field] for field in fields})\
+                .exclude(pk=group['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0010_hit_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='count',
+            field=models.PositiveIntegerField(default=1, verbose_name='Count'),
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='day',
+            field=models.DateField(default=django.utils.timezone.localdate, verbose_name='Day'),
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='site_id',
+            field=models.CharField(default='', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='searchterm',
+            name='day',
+            field=models.DateField(default=django.utils.timezone.localdate, verbose_name='Day'),
+        ),
+        migrations.AddField(
+            model_name='searchterm',
+            name='site_id',
+            field=models.CharField(default='', max_length=500),
+        ),
+        migrations.RunPython(merge_daily_counts, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='campaign',
+            name='ip',
+        ),
+        migrations.RemoveField(
+            model_name='searchterm',
+            name='session',
+        ),
+        migrations.AddConstraint(
+            model_name='campaign',
+            constraint=models.UniqueConstraint(fields=('site_id', 'key', 'value', 'day'), name='unique_campaign_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='searchterm',
+            constraint=models.UniqueConstraint(fields=('site_id', 'value', 'day'), name='unique_searchterm_day'),
+        ),
+    ]
@@ -1,18 +1,26 @@
 
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 from django.utils.translation import gettext_lazy as _
 
 from ...core.models import BaseModelMixin
 
-from .managers import HitManager, HitPublicManager
+from .managers import HitManager, HitPublicManager, RollupQueryset
 
 
 def jsondef():
     return dict()
 
 
+class TrafficSource(models.TextChoices):
+    SOCIAL = 'social', _('Social')
+    SEARCH = 'search', _('Search')
+    REFERRAL = 'referral', _('Referral')
+    DIRECT = 'direct', _('Direct')
+
+
 class Hit(BaseModelMixin):
 
     site_id = models.CharField(max_length=500)
@@ -39,6 +47,13 @@ class Hit(BaseModelMixin):
     response_status = models.PositiveIntegerField(blank=True, null=True)
     debug = models.BooleanField(default=settings.DEBUG)
 
+    # classified when written
+    is_bot = models.BooleanField(_("Is bot"), default=False, db_index=True)
+    traffic_source = models.CharField(
+        _("Traffic source"), max_length=20, db_index=True,
+        choices=TrafficSource.choices, default=TrafficSource.DIRECT)
+    ua_family = models.CharField(_("User agent family"), max_length=50, blank=True, default='')
+
     #
 
     objects = HitManager()
@@ -52,40 +67,117 @@ class Hit(BaseModelMixin):
             if self.user_agent:
                 self.user_agent = self.user_agent.lower()
 
+            self.classify()
+
         return super().save(*args, **kwargs)
 
+    def classify(self):
+        from ..classifier import classify
+
+        for field, value in classify(
+                path=self.path, url=self.url,
+                referrer=self.referrer, user_agent=self.user_agent).items():
+            setattr(self, field, value)
+
     class Meta:
         ordering = ('-created', '-updated',)
         verbose_name = _('Hit')
         verbose_name_plural = _('Hits')
+        indexes = [
+            # today(), yesterday(), rollups and retention ranges
+            models.Index(fields=['-created'], name='hit_created_idx'),
+            models.Index(fields=['site_id', '-created'], name='hit_site_created_idx'),
+            # Listing and counting human traffic
+            models.Index(
+                fields=['-created'], name='hit_human_created_idx',
+                condition=models.Q(is_bot=False)),
+        ]
 
     def __str__(self):
         return f'{self.response_status}: {self.path}'
 
 
+class RollupMixin(models.Model):
+    """
+    Hit counts of public hits, grouped by path, status and bot flag.
+    Maintained by `manage.py rollup_hits`.
+    """
+
+    site_id = models.CharField(max_length=500)
+    path = models.TextField(max_length=500)
+    response_status = models.PositiveIntegerField(blank=True, null=True)
+    is_bot = models.BooleanField(default=False)
+
+    hits = models.PositiveIntegerField(default=0)
+    # unique sessions of the period, for this path
+    sessions = models.PositiveIntegerField(default=0)
+
+    objects = RollupQueryset.as_manager()
+
+    class Meta:
+        abstract = True
+
+
+class HitRollup(RollupMixin):
+    hour = models.DateTimeField(_("Hour"), db_index=True)
+
+    class Meta:
+        ordering = ('-hour',)
+        verbose_name = _('Hourly hits')
+        verbose_name_plural = _('Hourly hits')
+        indexes = [models.Index(fields=['site_id', 'hour'])]
+
+
+class DailyHitRollup(RollupMixin):
+    day = models.DateField(_("Day"), db_index=True)
+
+    class Meta:
+        ordering = ('-day',)
+        verbose_name = _('Daily hits')
+        verbose_name_plural = _('Daily hits')
+        indexes = [models.Index(fields=['site_id', 'day'])]
+
+
 class SearchTerm(BaseModelMixin):
-    session = models.CharField(max_length=300)
+    """
+    Searches of a term, per site and day
+    """
+
+    site_id = models.CharField(max_length=500, default='')
     value = models.CharField(_("Term"), max_length=99)
+    day = models.DateField(_("Day"), default=timezone.localdate)
     count = models.PositiveIntegerField(_("Count"), default=1)
 
     class Meta:
         verbose_name = _('Search Term')
         verbose_name_plural = _('Search Terms')
         ordering = ('-updated', '-created',)
+        constraints = [
+            models.UniqueConstraint(
+                fields=['site_id', 'value', 'day'], name='unique_searchterm_day')
+        ]
 
 
 class Campaign(BaseModelMixin):
+    """
+    Hits with a query string value, per site and day
+    """
+
     is_pinned = models.BooleanField(_("Is pinned"), default=False)
+    site_id = models.CharField(max_length=500, default='')
     key = models.CharField(max_length=99)
     value = models.CharField(_("Term"), max_length=99)
-    ip = models.GenericIPAddressField(
-        unpack_ipv4=True, verbose_name=_('Ip address'),
-        null=True, blank=True)
+    day = models.DateField(_("Day"), default=timezone.localdate)
+    count = models.PositiveIntegerField(_("Count"), default=1)
 
     class Meta:
         verbose_name = _('Campaign')
         verbose_name_plural = _('Campaigns')
         ordering = ('is_pinned', '-updated', '-created',)
+        constraints = [
+            models.UniqueConstraint(
+                fields=['site_id', 'key', 'value', 'day'], name='unique_campaign_day')
+        ]
 
 
 # class HitRangeUnit(models.TextChoices):
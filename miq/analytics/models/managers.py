@@ -1,6 +1,6 @@
 from django.db import models
 import datetime
-from datetime import date
+from django.utils import timezone
 
 # from datetime import timedelta
 
@@ -13,40 +13,31 @@ class HitQueryset(models.QuerySet):
     def is_search(self):
         return self.filter(path__contains='?=')
 
-    def today(self):
-        today = date.today()
+    def day(self, day):
+        # A range on created, unlike created__day, can use the index
+        start = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
         return self.filter(
-            created__day=today.day, created__year=today.year,
-            created__month=today.month).order_by('-created')
+            created__gte=start,
+            created__lt=start + datetime.timedelta(days=1)).order_by('-created')
+
+    def today(self):
+        return self.day(timezone.localdate())
 
     def yesterday(self):
-        yst = date.today() - datetime.timedelta(1)
-        return self.filter(
-            created__day=yst.day, created__year=yst.year,
-            created__month=yst.month).order_by('-created')
+        return self.day(timezone.localdate() - datetime.timedelta(1))
 
     def social(self):
-        # return self.get_queryset().filter(
-        return self.filter(
-            # models.Q(referrer__icontains='fb')
-            # | models.Q(user_agent__icontains='fb')
-            models.Q(user_agent__icontains='instagram')
-            | models.Q(referrer__icontains='instagram')
-        ).distinct()
+        return self.filter(traffic_source='social')
 
     def external(self):
         return self.exclude(referrer__isnull=False)
         # .filter(referrer__icontains=domain_name)
 
     def is_not_bot(self):
-        return self.exclude(pk__in=self.is_bot().values_list('pk', flat=True))
+        return self.filter(is_bot=False)
 
     def is_bot(self):
-        return self.filter(
-            models.Q(path__icontains='bot')
-            | models.Q(user_agent__icontains='bot')
-            | models.Q(user_agent__icontains='robot')
-        ).distinct()
+        return self.filter(is_bot=True)
 
 
 class HitManager(models.Manager):
@@ -59,3 +50,21 @@ class HitPublicManager(HitManager):
         return super().get_queryset(*args, **kwargs)\
             .exclude(path__startswith='/admin')\
             .exclude(path__icontains='/api/')
+
+
+class RollupQueryset(models.QuerySet):
+    def get_counts(self) -> dict:
+        return {
+            'count': models.Sum('hits', filter=models.Q(is_bot=False), default=0),
+            'bots': models.Sum('hits', filter=models.Q(is_bot=True), default=0),
+        }
+
+    def summary(self) -> dict:
+        return self.aggregate(**self.get_counts())
+
+    def series(self, period: str):
+        """
+        Hit counts per period ('hour' or 'day')
+        """
+
+        return self.values(period).annotate(**self.get_counts()).order_by(period)
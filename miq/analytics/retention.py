@@ -0,0 +1,121 @@
+"""
+HIT RETENTION
+
+Hits older than settings.MIQ_HIT_RETENTION_DAYS (default 90) are rolled
+up, archived and deleted by `manage.py prune_hits`.
+
+Archives are gzipped JSON lines, one file per day:
+<MIQ_HIT_ARCHIVE_DIR>/hits/YYYY/MM/YYYY-MM-DD.jsonl.gz
+
+Hits are processed in batches by id, each batch is archived then deleted
+in its own short transaction.
+"""
+
+import os
+import gzip
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import DailyHitRollup, Hit
+from .rollups import get_day_range, rollup_day
+
+
+def get_retention_days() -> int:
+    return getattr(settings, 'MIQ_HIT_RETENTION_DAYS', 90)
+
+
+def get_retention_cutoff(days: int = None):
+    """
+    Start of the oldest day kept, days are pruned whole
+    """
+
+    day = timezone.localdate() - timedelta(days=days or get_retention_days())
+    return get_day_range(day)[0]
+
+
+def get_archive_path(archive_dir: str, day) -> str:
+    return os.path.join(
+        archive_dir, 'hits', f'{day:%Y}', f'{day:%m}', f'{day:%Y-%m-%d}.jsonl.gz')
+
+
+def json_default(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def archive_hits(rows: list, archive_dir: str) -> list:
+    """
+    Appends rows (Hit values) to their daily archive, returns the paths
+    """
+
+    days = {}
+    for row in rows:
+        days.setdefault(timezone.localdate(row['created']), []).append(row)
+
+    paths = []
+    for day, day_rows in days.items():
+        path = get_archive_path(archive_dir, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Appending adds a gzip member, readers see one stream
+        with gzip.open(path, 'at', encoding='utf-8') as file:
+            for row in day_rows:
+                file.write(json.dumps(row, default=json_default))
+                file.write('\n')
+        paths.append(path)
+
+    return paths
+
+
+def rollup_expired_days(cutoff):
+    """
+    Makes sure every day about to be pruned has its rollups
+    """
+
+    first = Hit.objects.filter(created__lt=cutoff).order_by('created')\
+        .values_list('created', flat=True).first()
+    if not first:
+        return []
+
+    days = []
+    day = timezone.localdate(first)
+    while get_day_range(day)[0] < cutoff:
+        if not DailyHitRollup.objects.filter(day=day).exists():
+            rollup_day(day)
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def prune_hits(*, cutoff, archive_dir: str = None, batch_size: int = 5000, pause: float = 0, log=None) -> int:
+    """
+    Archives (when archive_dir is set) and deletes the hits created
+    before cutoff. Returns the number of deleted hits.
+    """
+
+    qs = Hit.objects.filter(created__lt=cutoff).order_by('pk')
+    deleted = 0
+    last_pk = 0
+    while True:
+        rows = list(qs.filter(pk__gt=last_pk).values()[:batch_size])
+        if not rows:
+            break
+
+        last_pk = rows[-1]['id']
+        if archive_dir:
+            archive_hits(rows, archive_dir)
+
+        with transaction.atomic():
+            count, _ = Hit.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        deleted += count
+
+        if log:
+            log(f'{deleted} hits deleted')
+        if pause:
+            time.sleep(pause)
+
+    return deleted
@@ -0,0 +1,77 @@
+"""
+HIT ROLLUPS
+
+Hourly and daily hit counts, so that summaries read O(days) rows
+instead of scanning hits.
+
+Rollups are rebuilt a whole day at a time, starting from the last
+rolled-up day. Run `manage.py rollup_hits` periodically (every few minutes).
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db import models, transaction
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import DailyHitRollup, Hit, HitRollup
+
+GROUP_FIELDS = ('site_id', 'path', 'response_status', 'is_bot')
+
+
+def get_day_range(day) -> tuple:
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def aggregate_hits(qs, **period):
+    return qs\
+        .annotate(**period)\
+        .values(*GROUP_FIELDS, *period.keys())\
+        .annotate(hits=models.Count('pk'), sessions=models.Count('session', distinct=True))\
+        .order_by()
+
+
+def rollup_day(day) -> int:
+    """
+    Rebuilds the hourly and daily rollups of day, returns the hit count
+    """
+
+    start, end = get_day_range(day)
+    hits = Hit.public.filter(created__gte=start, created__lt=end)
+
+    hourly = [HitRollup(**row) for row in aggregate_hits(hits, hour=TruncHour('created'))]
+    daily = [DailyHitRollup(day=day, **row) for row in aggregate_hits(hits)]
+
+    with transaction.atomic():
+        HitRollup.objects.filter(hour__gte=start, hour__lt=end).delete()
+        DailyHitRollup.objects.filter(day=day).delete()
+        HitRollup.objects.bulk_create(hourly, batch_size=1000)
+        DailyHitRollup.objects.bulk_create(daily, batch_size=1000)
+
+    return sum(row.hits for row in daily)
+
+
+def rollup_hits(since=None) -> list:
+    """
+    Rebuilds the rollups from since (a date), or from the last
+    rolled-up day, up to today. Returns the days rebuilt.
+    """
+
+    today = timezone.localdate()
+    first = Hit.objects.order_by('created').values_list('created', flat=True).first()
+    first = timezone.localdate(first) if first else today
+
+    if since is None:
+        since = DailyHitRollup.objects.aggregate(day=models.Max('day'))['day']
+
+    # Pruned days (manage.py prune_hits) only live in their rollups
+    since = max(since or first, first)
+
+    days = []
+    day = since
+    while day <= today:
+        rollup_day(day)
+        days.append(day)
+        day += timedelta(days=1)
+    return days
@@ -11,7 +11,7 @@ class HitSerializer(serializers.ModelSerializer):
         read_only_fields = (
             'slug', 'url', 'path', 'source_id', 'app', 'model', 'ip', 'session',
             'referrer', 'user_agent', 'method', 'response_status', 'debug', 'session_data',
-            'created', 'updated'
+            'is_bot', 'traffic_source', 'ua_family', 'created', 'updated'
         )
         fields = read_only_fields
 
@@ -28,7 +28,7 @@ class CampaignSummarySerializer(serializers.ModelSerializer):
 
 class CampaignSerializer(CampaignSummarySerializer):
     class Meta(CampaignSummarySerializer.Meta):
-        read_only_fields = ('slug', 'key', 'value', 'ip', 'created', 'updated')
+        read_only_fields = ('slug', 'site_id', 'key', 'value', 'day', 'count', 'created', 'updated')
         fields = ('is_pinned', *read_only_fields)
 
 
@@ -36,5 +36,5 @@ class SearchTermSerializer(serializers.ModelSerializer):
     class Meta:
         model = SearchTerm
         queryset = SearchTerm.objects.all()
-        read_only_fields = ('slug', 'session', 'value', 'count', 'created', 'updated')
+        read_only_fields = ('slug', 'site_id', 'value', 'day', 'count', 'created', 'updated')
         fields = read_only_fields
@@ -1,10 +1,18 @@
 
+from collections import Counter, namedtuple
 from urllib.parse import urlparse, parse_qs
 
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
 from ..core.utils import get_ip
 
 from .models import Campaign, Hit, SearchTerm
 
+# campaigns: [(key, value)], terms: [value]
+HitEntry = namedtuple('HitEntry', 'hit campaigns terms')
+
 exclude = [
     '/admin/', 'staff',
     '/media/', '/favicon.ico',
@@ -12,6 +20,19 @@ exclude = [
 
 
 def create_hit(request, response, /, source: str = None) -> Hit:
+    """
+    Records the hit of a request with the configured recorder,
+    the returned hit is not saved yet when buffered.
+    """
+
+    from .buffer import get_hit_recorder
+
+    if entry := get_hit_entry(request, response, source):
+        get_hit_recorder().record(entry)
+        return entry.hit
+
+
+def get_hit_entry(request, response, /, source: str = None) -> HitEntry:
     for match in exclude:
         if match in request.path:
             return
@@ -49,31 +70,118 @@ def create_hit(request, response, /, source: str = None) -> Hit:
         'user_agent': request.META.get('HTTP_USER_AGENT'),
     }
 
+    # Cached pages carry the hit data of their object
+    hit_data = getattr(response, 'hit_data', None)
     ctx = getattr(response, 'context_data', {})
-    if ctx and (obj := ctx.get('object')):
+    if not hit_data and ctx and (obj := ctx.get('object')):
         try:
-            if hit_data := obj.get_hit_data():
-                data['session_data'] = hit_data
-                data['app'] = hit_data.get('app')
-                data['model'] = hit_data.get('model')
+            hit_data = obj.get_hit_data()
         except Exception as e:
             print(e)
 
+    if hit_data:
+        data['session_data'] = hit_data
+        data['app'] = hit_data.get('app')
+        data['model'] = hit_data.get('model')
+
+    if data['referrer']:
+        data['referrer'] = data['referrer'].lower()
+    if data['user_agent']:
+        data['user_agent'] = data['user_agent'].lower()
+
+    # Cut to the columns, one long value would fail the whole batch
+    key_length = Campaign._meta.get_field('key').max_length
+    value_length = Campaign._meta.get_field('value').max_length
+    term_length = SearchTerm._meta.get_field('value').max_length
+
+    campaigns = []
     query = parse_qs(urlparse(url).query)
     for key in query.keys():
         if key == 'q':
             continue
 
         for value in query.get(key, []):
-            Campaign.objects.get_or_create(key=key.lower(), value=value.lower(), ip=ip)
-
-    for q in query.get('q', []):
-        if not q:
+            campaigns.append((key.lower()[:key_length], value.lower()[:value_length]))
+
+    terms = [q[:term_length] for q in query.get('q', []) if q]
+
+    hit = Hit(**data)
+    hit.classify()
+    return HitEntry(hit, campaigns, terms)
+
+
+def write_hits(entries):
+    """
+    Saves hits in bulk, along with the daily counts
+    of their campaigns and search terms, all or nothing
+    """
+
+    with transaction.atomic():
+        Hit.objects.bulk_create([entry.hit for entry in entries], batch_size=500)
+
+        campaigns = Counter()
+        terms = Counter()
+        for entry in entries:
+            site_id = str(entry.hit.site_id)
+            day = timezone.localdate(entry.hit.created)
+            campaigns.update((site_id, key, value, day) for key, value in entry.campaigns)
+            terms.update((site_id, value, day) for value in entry.terms)
+
+        upsert_counts(Campaign, ('site_id', 'key', 'value', 'day'), campaigns)
+        upsert_counts(SearchTerm, ('site_id', 'value', 'day'), terms)
+
+
+def upsert_counts(model, fields: tuple, counts: Counter, batch_size: int = 500):
+    """
+    Adds counts ({(values of fields): count}) to the rows unique on fields,
+    creating the missing ones. One INSERT ... ON CONFLICT DO UPDATE
+    statement per batch on postgres and sqlite.
+    """
+
+    if not counts:
+        return
+
+    using = router.db_for_write(model)
+    connection = connections[using]
+    if connection.vendor not in ('postgresql', 'sqlite'):
+        return upsert_counts_fallback(model, fields, counts, using)
+
+    qn = connection.ops.quote_name
+    opts = model._meta
+    table = qn(opts.db_table)
+    db_fields = [field for field in opts.concrete_fields if not field.primary_key]
+    count = qn(opts.get_field('count').column)
+    updated = qn(opts.get_field('updated').column)
+
+    sql = (
+        f'INSERT INTO {table} ({", ".join(qn(field.column) for field in db_fields)}) VALUES {{values}} '
+        f'ON CONFLICT ({", ".join(qn(opts.get_field(name).column) for name in fields)}) DO UPDATE SET '
+        f'{count} = {table}.{count} + EXCLUDED.{count}, {updated} = EXCLUDED.{updated}'
+    )
+    placeholders = f'({", ".join(["%s"] * len(db_fields))})'
+
+    items = sorted(counts.items())
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        for i in range(0, len(items), batch_size):
+            batch = items[i:i + batch_size]
+            params = []
+            for values, value_count in batch:
+                # Defaults, slug and dates set as on save
+                obj = model(count=value_count, **dict(zip(fields, values)))
+                params.extend(
+                    field.get_db_prep_save(field.pre_save(obj, True), connection) for field in db_fields)
+            cursor.execute(sql.format(values=', '.join([placeholders] * len(batch))), params)
+
+
+def upsert_counts_fallback(model, fields: tuple, counts: Counter, using: str):
+    qs = model.objects.using(using)
+    for values, count in sorted(counts.items()):
+        lookup = dict(zip(fields, values))
+        if qs.filter(**lookup).update(count=F('count') + count, updated=timezone.now()):
             continue
-
-        term, new = SearchTerm.objects.get_or_create(session=session, value=q)
-        if not new:
-            term.count += 1
-            term.save()
-
-    return Hit.objects.create(**data)
+        try:
+            with transaction.atomic(using=using):
+                qs.create(count=count, **lookup)
+        except IntegrityError:
+            # Created in the meantime
+            qs.filter(**lookup).update(count=F('count') + count, updated=timezone.now())
@@ -1,6 +1,8 @@
 # import logging
+from datetime import timedelta
 
 from django.db import models
+from django.utils import timezone
 # from django.db import IntegrityError
 # from django.utils.translation import gettext_lazy as _
 
@@ -12,14 +14,25 @@ from rest_framework.permissions import IsAdminUser
 
 from miq.staff.mixins import LoginRequiredMixin
 from miq.core.permissions import DjangoModelPermissions
-from miq.core.pagination import MiqPageNumberPagination
+from miq.core.pagination import MiqKeysetPagination, MiqPageNumberPagination
 
-from ..models import Campaign, Hit, SearchTerm
+from ..models import Campaign, Hit, SearchTerm, TrafficSource
+from ..models import DailyHitRollup, HitRollup
+from ..rollups import get_day_range
 from ..serializers import HitSerializer, SearchTermSerializer
 from ..serializers import CampaignSerializer, CampaignSummarySerializer
 
 
-class HitPagination(MiqPageNumberPagination):
+class HitPagination(MiqKeysetPagination):
+    page_size = 100
+
+
+class CampaignPagination(HitPagination):
+    ordering = ('is_pinned', '-created', '-id')
+
+
+class CampaignSummaryPagination(MiqPageNumberPagination):
+    # Grouped rows have no keyset
     page_size = 100
 
 
@@ -33,6 +46,16 @@ class Mixin(LoginRequiredMixin, viewsets.ModelViewSet):
 class CampaignViewset(Mixin):
     queryset = Campaign.objects.all()
     serializer_class = CampaignSerializer
+    pagination_class = CampaignPagination
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.is_summary():
+                self._paginator = CampaignSummaryPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
     def get_serializer_class(self):
         if self.is_summary():
@@ -44,7 +67,7 @@ class CampaignViewset(Mixin):
         # params = self.request.query_params
         if self.is_summary():
             qs = qs.values('key', 'value')\
-                .annotate(count=models.Count('ip'))\
+                .annotate(count=models.Sum('count'))\
                 .order_by('-count')
 
         return qs
@@ -79,21 +102,43 @@ class HitViewset(Mixin):
 
     @action(methods=['get'], detail=False, url_path=r'summary')
     def summary(self, request, *args, **kwargs):
-        qs = self.get_queryset()
-        today = qs.today()
-        yst = qs.yesterday()
+        """
+        Today and yesterday counts, from the daily rollups
+        """
+
+        today = timezone.localdate()
+        qs = DailyHitRollup.objects.all()
         data = {
-            'today': {
-                'count': today.is_not_bot().count(),
-                'bots': today.is_bot().count()
-            },
-            'yesterday': {
-                'count': yst.is_not_bot().count(),
-                'bots': yst.is_bot().count()
-            },
+            'today': qs.filter(day=today).summary(),
+            'yesterday': qs.filter(day=today - timedelta(days=1)).summary(),
         }
         return Response(data=data)
 
+    @action(methods=['get'], detail=False, url_path=r'timeseries')
+    def timeseries(self, request, *args, **kwargs):
+        """
+        Counts per day or hour, from the rollups
+        ?unit=day|hour&days=30&path=/exact/path/
+        """
+
+        params = request.query_params
+        days = params.get('days', '30')
+        if not days.isdigit() or not 0 < int(days) <= 366:
+            raise serializers.ValidationError({'days': 'Between 1 and 366'})
+
+        start = timezone.localdate() - timedelta(days=int(days) - 1)
+        if params.get('unit') == 'hour':
+            period = 'hour'
+            qs = HitRollup.objects.filter(hour__gte=get_day_range(start)[0])
+        else:
+            period = 'day'
+            qs = DailyHitRollup.objects.filter(day__gte=start)
+
+        if path := params.get('path'):
+            qs = qs.filter(path=path)
+
+        return Response(data=list(qs.series(period)))
+
     def get_queryset(self):
         qs = super().get_queryset()
         params = self.request.query_params
@@ -103,6 +148,10 @@ class HitViewset(Mixin):
         if bot == '1':
             qs = qs.is_bot()
 
+        source = params.get('source')
+        if source in TrafficSource.values:
+            qs = qs.filter(traffic_source=source)
+
         path = params.get('path')
         if path and isinstance(path, str):
             qs = qs.filter(path__icontains=path)
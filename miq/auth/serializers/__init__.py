@@ -6,6 +6,7 @@ from rest_framework import serializers
 from miq.models import File, Image
 from miq.models import TextSection
 from miq.models import Section, ImageSection, MarkdownSection, JumbotronSection
+from miq.core.serializers import SectionListSerializer
 
 User = get_user_model()
 
@@ -19,7 +20,7 @@ class ImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Image
         read_only_fields = (
-            'slug', 'name', 'name_truncated',
+            'slug', 'name', 'name_truncated', 'status',
             'height', 'width', 'size',
             'height_mobile', 'width_mobile', 'size_mobile',
             'created', 'updated',
@@ -96,6 +97,7 @@ class AccountSerializer(UserListSerializer):
 class SectionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Section
+        list_serializer_class = SectionListSerializer
         read_only_fields = ('slug', 'image', 'images_data',)
         fields = (
             *read_only_fields,
@@ -112,11 +114,8 @@ class SectionSerializer(serializers.ModelSerializer):
     images_data = serializers.SerializerMethodField()
 
     def get_images_data(self, instance):
-        if instance.images.exists():
-            return ImageSerializer(
-                instance.images.order_by('created'), many=True
-            ).data
-        return []
+        images = sorted(instance.ordered_images, key=lambda img: img.created)
+        return ImageSerializer(images, many=True).data
 
 
 """
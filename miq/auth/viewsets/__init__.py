@@ -1,6 +1,5 @@
 
 
-from io import BytesIO
 # from django.utils.text import slugify
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
@@ -9,14 +8,15 @@ from django.contrib.sites.shortcuts import get_current_site
 
 from rest_framework import viewsets, status, serializers
 from rest_framework.response import Response
+from rest_framework.decorators import action
 from rest_framework.serializers import ValidationError
 from rest_framework.parsers import JSONParser, MultiPartParser
 
-from miq.utils import get_file_ext
-from miq.utils import download_img_from_url, img_file_from_response
+from miq.core.utils import download_img_file
 from miq.models import Section, Image, File
 
 from miq.mixins import DevLoginRequiredMixin
+from miq.core.viewsets import BulkUploadMixin
 
 from ..serializers import (
     # images
@@ -38,7 +38,7 @@ IMAGE
 """
 
 
-class ImageViewset(DevLoginRequiredMixin, viewsets.ModelViewSet):
+class ImageViewset(BulkUploadMixin, DevLoginRequiredMixin, viewsets.ModelViewSet):
     lookup_field = 'slug'
     serializer_class = ImageSerializer
     queryset = Image.objects.none()
@@ -49,16 +49,15 @@ class ImageViewset(DevLoginRequiredMixin, viewsets.ModelViewSet):
         data = request.data
         src = data.get('src')
         if isinstance(src, str):
-            res = download_img_from_url(src)
-            if not res:
+            file = download_img_file(src)
+            if not file:
                 raise serializers.ValidationError(
                     {'submit': _('Invalid action')})
 
             serializer = self.get_serializer(
                 data={
                     'alt_text': data.get('alt_text', ''),
-                    'src': img_file_from_response(res, None, get_file_ext(src))
-                    # 'src': File(BytesIO(r.content), name=filename)
+                    'src': file
                 }
             )
 
@@ -74,6 +73,20 @@ class ImageViewset(DevLoginRequiredMixin, viewsets.ModelViewSet):
 
         return super().create(request, *args, **kwargs)
 
+    @action(methods=['post'], detail=True, url_path=r'retry')
+    def retry(self, request, *args, **kwargs):
+        """
+        Regenerate the derivatives of a failed image
+        """
+
+        instance = self.get_object()
+        if instance.is_ready:
+            raise serializers.ValidationError(
+                {'status': _('Image already processed')})
+
+        instance.retry()
+        return Response(self.get_serializer(instance).data)
+
     def get_queryset(self):
         qs = Image.objects.active()\
             .user(self.request.user)\
@@ -3,7 +3,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin
 
 from .models import SiteSetting
-from .models import Image
+from .models import Image, Thumbnail
 from .models import Section
 from .models import Index, Page
 
@@ -25,6 +25,7 @@ class CustomUserAdmin(UserAdmin):
 # admin.site.register(CustomUser, CustomUserAdmin)
 
 admin.site.register(Image)
+admin.site.register(Thumbnail)
 
 admin.site.register(Index)
 admin.site.register(Section)
@@ -9,4 +9,4 @@ class MiqConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
 
     def ready(self):
-        from . import signals
+        from . import checks, signals
@@ -0,0 +1,190 @@
+"""
+CLIENT BUILD
+
+Steps of `manage.py build` that can be skipped when nothing changed:
+- the client sources are fingerprinted, the js build only runs when
+  the fingerprint changes
+- static files are synced to STATIC_ROOT by content hash, only changed
+  files are copied, in parallel
+- base-react.html is only regenerated when the built index.html changes
+
+The fingerprints and hashes are kept in <BUILD_DIR>/.miq-build.json,
+out of the client sources (dotfiles are not collected as static files)
+"""
+
+import os
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from bs4 import BeautifulSoup
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+
+from .storage import use_static_tags
+
+STATE_FILE = '.miq-build.json'
+IGNORED_DIRS = ('node_modules', 'build', '.git', '.cache')
+IGNORED_STATIC = ['CVS', '.*', '*~']
+
+
+def hash_file(file) -> str:
+    """
+    Content hash of a path or an open binary file
+    """
+
+    digest = hashlib.sha256()
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, 'rb') as f:
+            return hash_file(f)
+
+    for chunk in iter(lambda: file.read(1024 * 1024), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint_dir(root: str, ignore: tuple = IGNORED_DIRS) -> str:
+    """
+    Hash of the names and contents of the files under root
+    """
+
+    digest = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(name for name in dirnames if name not in ignore)
+        for name in sorted(filenames):
+            if name == STATE_FILE:
+                continue
+
+            path = os.path.join(dirpath, name)
+            digest.update(os.path.relpath(path, root).encode())
+            digest.update(hash_file(path).encode())
+    return digest.hexdigest()
+
+
+def get_state_path() -> str:
+    return os.path.join(settings.BUILD_DIR, STATE_FILE)
+
+
+def read_state(path: str) -> dict:
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_state(path: str, state: dict):
+    with open(path, 'w') as file:
+        json.dump(state, file)
+
+
+"""
+STATIC FILES
+"""
+
+
+def get_static_files() -> dict:
+    """
+    {prefixed path: (source storage, path)}, first found wins as with collectstatic
+    """
+
+    found = {}
+    for finder in finders.get_finders():
+        for path, storage in finder.list(IGNORED_STATIC):
+            prefix = getattr(storage, 'prefix', None)
+            found.setdefault(os.path.join(prefix, path) if prefix else path, (storage, path))
+    return found
+
+
+def hash_static_files(workers: int = 8) -> dict:
+    """
+    {prefixed path: hash} of the static files, as recorded by sync_static_files
+    """
+
+    def digest(item):
+        name, (source, path) = item
+        with source.open(path) as file:
+            return name, hash_file(file)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(digest, get_static_files().items()))
+
+
+def sync_static_files(hashes: dict, workers: int = 8) -> tuple:
+    """
+    Copies the static files whose content changed since hashes
+    ({prefixed path: hash} of the previous sync) and deletes the
+    removed ones. Returns (copied, deleted, hashes).
+    """
+
+    storage = staticfiles_storage
+    found = get_static_files()
+
+    def sync(item):
+        name, (source, path) = item
+        with source.open(path) as file:
+            digest = hash_file(file)
+
+        if hashes.get(name) == digest and storage.exists(name):
+            return name, digest, False
+
+        if storage.exists(name):
+            storage.delete(name)
+        with source.open(path) as file:
+            storage.save(name, file)
+        return name, digest, True
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(sync, found.items()))
+
+    copied = [name for name, digest, changed in results if changed]
+    deleted = [name for name in hashes if name not in found]
+    for name in deleted:
+        if storage.exists(name):
+            storage.delete(name)
+
+    manifest = getattr(storage, 'manifest_name', None)
+    if hasattr(storage, 'post_process') and (
+            copied or deleted or (manifest and not storage.exists(manifest))):
+        # Hashed copies of unchanged files already exist, they are not rewritten
+        for name, hashed_name, processed in storage.post_process(found, dry_run=False):
+            if isinstance(processed, Exception):
+                raise processed
+
+    return copied, deleted, {name: digest for name, digest, changed in results}
+
+
+"""
+TEMPLATE
+"""
+
+
+def render_base_template(index_html: str) -> str:
+    """
+    base-react.html from the index.html of the client build
+    """
+
+    soup = BeautifulSoup(index_html, 'html.parser')
+
+    soup.title.replace_with("{% block head %}{% endblock head %}")
+
+    root = soup.find("div", id="root")
+    root.insert_before(
+        "{% block pre_react %}{% endblock pre_react %}{% block react %}")
+    root.insert_after(
+        "{% endblock react %}{% block post_react %}{% endblock post_react %}")
+
+    style = soup.new_tag('style', type="text/css", id='page-css')
+    style.string = "{% block css %}{% endblock css %}"
+    soup.head.insert(len(soup.head.contents), style)
+
+    style = soup.find("style", id="page-css")
+
+    style.insert_before("{% block css_links %}{% endblock css_links %}")
+
+    # Client assets through the static manifest, hashed names
+    use_static_tags(soup)
+
+    return '{% load static %}' + str(soup)
@@ -0,0 +1,188 @@
+"""
+CACHE
+
+Versioned cache keys: data is cached under a key that includes a version,
+bumping the version (on save signals) invalidates it in every process.
+
+Site settings snapshots are also kept process-local, and only the
+version is read from the cache on each request.
+
+The content version of a site changes with its pages, sections and
+images, it keys the page cache (views/cache.py).
+
+User permissions are cached under a single permissions version, bumped
+whenever groups, permissions or their assignments change.
+"""
+
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.core.cache import cache
+
+from .models.setting import SiteSetting
+
+SITE_SETTINGS_VERSION_KEY = 'miq:site-settings:version:{site_id}'
+CONTENT_VERSION_KEY = 'miq:content:version:{site_id}'
+PERMISSIONS_VERSION_KEY = 'miq:perms:version'
+
+_site_settings = {}
+
+
+def new_cache_version() -> int:
+    # Time based, an evicted version does not come back with an old value
+    return int(time.time() * 1000)
+
+
+def get_cache_version(key: str) -> int:
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, new_cache_version(), timeout=None)
+        # A dummy cache stores nothing, snapshots are rebuilt each time
+        version = cache.get(key) or new_cache_version()
+    return version
+
+
+def bump_cache_version(key: str) -> int:
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = new_cache_version()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+"""
+SITE SETTINGS
+"""
+
+
+def build_site_settings_snapshot(site) -> dict:
+    """
+    Template context and sharedData entries for the settings of site
+    """
+
+    context = {'is_live': False}
+    shared_data = {}
+    snapshot = {'context': context, 'shared_data': shared_data}
+
+    setting = SiteSetting.objects.filter(site_id=site.id).first()
+    if not setting:
+        return snapshot
+
+    context['is_live'] = setting.is_live
+    context['close_template'] = {
+        'html': setting.ct_html,
+        'title': setting.ct_title,
+        'text': setting.ct_text
+    }
+
+    if number := setting.contact_number:
+        contact = {
+            'contact_number': number,
+            'contact_number_display': setting.contact_number_display or number,
+            'contact_number_title': setting.contact_number_title or '',
+        }
+        context.update(contact)
+        shared_data.update(contact)
+
+    if email := setting.contact_email:
+        context['contact_email'] = email
+
+    if number := setting.whatsapp_number:
+        whatsapp = {
+            'whatsapp_number': number,
+            'whatsapp_link': setting.whatsapp_link or '',
+            'whatsapp_link_title': setting.whatsapp_link_title or '',
+        }
+        context.update(whatsapp)
+        shared_data.update(whatsapp)
+
+    if ga := setting.ga_tracking:
+        context['ga_tracking'] = ga.strip()
+
+    if fb := setting.fb_pixel:
+        context['fb_pixel'] = fb.strip()
+
+    if fb := setting.fb_app_id:
+        context['fb_app_id'] = shared_data['fb_app_id'] = fb.strip()
+
+    if fb := setting.fb_app_secret:
+        context['fb_app_secret'] = shared_data['fb_app_secret'] = fb.strip()
+
+    return snapshot
+
+
+def get_site_settings_snapshot(site) -> dict:
+    version = get_cache_version(SITE_SETTINGS_VERSION_KEY.format(site_id=site.id))
+
+    local = _site_settings.get(site.id)
+    if local and local[0] == version:
+        return local[1]
+
+    key = f'miq:site-settings:{site.id}:{version}'
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_site_settings_snapshot(site)
+        cache.set(key, snapshot, getattr(settings, 'MIQ_SITE_SETTINGS_CACHE_TIMEOUT', 60 * 60 * 24))
+
+    _site_settings[site.id] = (version, snapshot)
+    return snapshot
+
+
+def invalidate_site_settings(site_id):
+    def invalidate():
+        _site_settings.pop(site_id, None)
+        bump_cache_version(SITE_SETTINGS_VERSION_KEY.format(site_id=site_id))
+
+    invalidate_on_commit(invalidate)
+
+
+def invalidate_on_commit(invalidate):
+    # Again after commit, cached data may have been rebuilt
+    # from the previous data in the meantime
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+"""
+CONTENT
+"""
+
+
+def get_content_version(site_id) -> int:
+    """
+    Changes whenever the public content of the site changes
+    """
+
+    return get_cache_version(CONTENT_VERSION_KEY.format(site_id=site_id))
+
+
+def invalidate_content(site_id):
+    invalidate_on_commit(lambda: bump_cache_version(CONTENT_VERSION_KEY.format(site_id=site_id)))
+
+
+"""
+PERMISSIONS
+"""
+
+
+def get_user_perms(user) -> list:
+    """
+    Sorted permission names of user, user.get_all_permissions() cached
+    """
+
+    if not user.is_active:
+        return []
+
+    version = get_cache_version(PERMISSIONS_VERSION_KEY)
+    key = f'miq:perms:{user.pk}:{version}'
+    perms = cache.get(key)
+    if perms is None:
+        perms = sorted(user.get_all_permissions())
+        cache.set(key, perms, getattr(settings, 'MIQ_PERMISSIONS_CACHE_TIMEOUT', 60 * 60 * 24))
+    return perms
+
+
+def invalidate_permissions():
+    invalidate_on_commit(lambda: bump_cache_version(PERMISSIONS_VERSION_KEY))
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core import checks
+from django.core.files.storage import storages
+from django.contrib.staticfiles.storage import ManifestFilesMixin
+
+
+@checks.register(checks.Tags.staticfiles)
+def check_static_storage(app_configs, **kwargs):
+    """
+    Templates link static files without a version param,
+    only hashed names change when the files do
+    """
+
+    if settings.DEBUG or isinstance(storages['staticfiles'], ManifestFilesMixin):
+        return []
+
+    return [checks.Warning(
+        'Static files are served under unversioned names, browsers may keep stale css and js.',
+        hint="Set STORAGES['staticfiles'] to 'miq.core.storage.ManifestStaticStorage'.",
+        id='miq.W001',
+    )]
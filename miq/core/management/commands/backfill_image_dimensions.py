@@ -0,0 +1,62 @@
+from django.db.models import Q
+from django.core.management.base import BaseCommand
+
+from miq.core.models import Image, Thumbnail
+
+IMAGE_FIELDS = ('src', 'src_mobile', 'thumb', 'thumb_sq')
+
+
+class Command(BaseCommand):
+    help = 'Store missing image and thumbnail dimensions and sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        missing = Q()
+        for field in IMAGE_FIELDS:
+            missing |= Q(**{f'{field}_width__isnull': True}) & ~Q(**{field: ''}) & Q(**{f'{field}__isnull': False})
+
+        count = self.backfill(
+            Image.objects.filter(missing), self.read_image,
+            Image.get_file_meta_fields(*IMAGE_FIELDS), batch_size)
+        self.stdout.write(f'Images: {count} updated')
+
+        count = self.backfill(
+            Thumbnail.objects.filter(width__isnull=True), self.read_thumbnail,
+            ['width', 'height', 'bytes'], batch_size)
+        self.stdout.write(f'Thumbnails: {count} updated')
+
+        self.stdout.write(self.style.SUCCESS('Done'))
+
+    def backfill(self, qs, read, fields, batch_size):
+        batch = []
+        count = 0
+        for obj in qs.order_by('pk').iterator(chunk_size=batch_size):
+            try:
+                read(obj)
+            except (OSError, ValueError) as e:
+                self.stderr.write(f'{obj}: {e}')
+                continue
+
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                count += len(batch)
+                qs.model.objects.bulk_update(batch, fields)
+                batch = []
+
+        if batch:
+            count += len(batch)
+            qs.model.objects.bulk_update(batch, fields)
+
+        return count
+
+    def read_image(self, obj):
+        for field in IMAGE_FIELDS:
+            if (file := getattr(obj, field)) and getattr(obj, f'{field}_width') is None:
+                obj.set_file_meta(field, file.width, file.height, file.size)
+
+    def read_thumbnail(self, obj):
+        obj.width, obj.height, obj.bytes = obj.src.width, obj.src.height, obj.src.size
@@ -1,12 +1,14 @@
 import os
 import subprocess
-from bs4 import BeautifulSoup
 
 from django.conf import settings
 from django.contrib.sites.models import Site
 from django.core.management import call_command
 from django.core.management.base import BaseCommand
 
+from miq.core.build import fingerprint_dir, get_state_path, hash_file, hash_static_files
+from miq.core.build import read_state, render_base_template, sync_static_files, write_state
+
 
 output_path = os.path.join(settings.TEMPLATES_DIR, 'base-react.html')
 
@@ -14,23 +16,37 @@ output_path = os.path.join(settings.TEMPLATES_DIR, 'base-react.html')
 class Command(BaseCommand):
     help = 'Collect React index.html and static files'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Build the client and export base-react.html even when unchanged')
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Clear STATIC_ROOT and collect every static file')
+        parser.add_argument(
+            '--workers', type=int, default=getattr(settings, 'MIQ_BUILD_WORKERS', 8))
+
+    def handle(self, *args, **options):
+        force = options['force']
+
         # First build
         if (site := Site.objects.first()) and not hasattr(site, 'settings'):
             site.save()
 
-        # print(settings.BUILD_DIR, '\n')
-
-        # if not os.path.isdir(settings.BUILD_DIR):
-        #     raise Exception('No build directory')
-
         client_dir = getattr(settings, 'CLIENT_DIR', 'client')
         if not os.path.isdir(client_dir):
             self.stdout.write(self.style.ERROR('No client directory found'))
             return
 
-        self.stdout.write('Building client app ...')
-        subprocess.run(['yarn', 'build'], cwd=client_dir)
+        state = read_state(get_state_path())
+
+        fingerprint = fingerprint_dir(client_dir)
+        if force or fingerprint != state.get('sources') or not os.path.isdir(settings.BUILD_DIR):
+            self.stdout.write('Building client app ...')
+            subprocess.run(['yarn', 'build'], cwd=client_dir, check=True)
+            state['sources'] = fingerprint
+        else:
+            self.stdout.write('Client sources unchanged, build skipped')
 
         if not os.path.isdir(settings.BUILD_DIR):
             raise Exception('No build directory')
@@ -42,35 +58,33 @@ class Command(BaseCommand):
             raise Exception('No index path')
 
         self.stdout.write('Collecting static files ...')
-        call_command(
-            'collectstatic', interactive=False,
-            clear=True, verbosity=0
-        )
+        if options['clear']:
+            call_command(
+                'collectstatic', interactive=False,
+                clear=True, verbosity=0
+            )
+            state['static'] = hash_static_files(workers=options['workers'])
+        else:
+            copied, deleted, state['static'] = sync_static_files(
+                state.get('static', {}), workers=options['workers'])
+            self.stdout.write(f'Static files: {len(copied)} copied, {len(deleted)} deleted')
 
         #
 
-        html = open(index_path).read()
-        soup = BeautifulSoup(html, 'html.parser')
-
-        soup.title.replace_with("{% block head %}{% endblock head %}")
-
-        root = soup.find("div", id="root")
-        root.insert_before(
-            "{% block pre_react %}{% endblock pre_react %}{% block react %}")
-        root.insert_after(
-            "{% endblock react %}{% block post_react %}{% endblock post_react %}")
-
-        style = soup.new_tag('style', type="text/css", id='page-css')
-        style.string = "{% block css %}{% endblock css %}"
-        soup.head.insert(len(soup.head.contents), style)
-
-        style = soup.find("style", id="page-css")
+        index_hash = hash_file(index_path)
+        if force or index_hash != state.get('index') or not os.path.exists(output_path):
+            with open(index_path) as file:
+                html = render_base_template(file.read())
 
-        style.insert_before("{% block css_links %}{% endblock css_links %}")
+            with open(output_path, 'w', encoding='utf-8') as file:
+                file.write(html)
+            state['index'] = index_hash
 
-        with open(output_path, 'w', encoding='utf-8') as file:
-            file.write(str(soup))
+            self.stdout.write(
+                self.style.SUCCESS(f'Exported file: {output_path}')
+            )
+        else:
+            self.stdout.write(f'index.html unchanged, {output_path} kept')
 
-        self.stdout.write(
-            self.style.SUCCESS(f'Exported file: {output_path}')
-        )
+        # The js build may have recreated BUILD_DIR
+        write_state(get_state_path(), state)
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.db.models import Q
+from django.core.management.base import BaseCommand
+
+from miq.core.models import Image, ImageStatus
+from miq.core.models.image import get_stale_q
+from miq.core.pipeline import process_image
+
+
+class Command(BaseCommand):
+    help = 'Generate pending image derivatives, run it periodically to pick up lost jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retry', action='store_true',
+            help='Also process images whose derivatives failed')
+        parser.add_argument(
+            '--max-attempts', type=int, default=3,
+            help='Skip failed or stale images tried this many times')
+        parser.add_argument(
+            '--timeout', type=int,
+            default=getattr(settings, 'MIQ_IMAGE_PROCESSING_TIMEOUT', 600),
+            help='Reclaim images left processing for more than this many seconds')
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help='Maximum number of images to process')
+
+    def handle(self, *args, **options):
+        max_attempts = options['max_attempts']
+        timeout = options['timeout']
+
+        # Their worker died, the last ones are given up on
+        abandoned = Image.objects.stale(timeout).filter(attempts__gte=max_attempts)\
+            .update(status=ImageStatus.FAILED, error='Processing timed out')
+
+        q = Q(status=ImageStatus.PENDING) | get_stale_q(timeout)
+        if options['retry']:
+            q |= Q(status=ImageStatus.FAILED, attempts__lt=max_attempts)
+
+        pks = Image.objects.filter(q).order_by('created').values_list('pk', flat=True)
+        if limit := options['limit']:
+            pks = pks[:limit]
+
+        done = failed = 0
+        for pk in list(pks):
+            if process_image(pk, stale_after=timeout):
+                done += 1
+            else:
+                failed += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {done} image(s), {failed} failed or skipped, {abandoned} timed out'))
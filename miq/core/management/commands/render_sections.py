@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from miq.core.cache import invalidate_content
+from miq.core.models import Section
+from miq.core.models.section import get_renderer_version
+
+FIELDS = ('rendered_html', 'renderer_version')
+
+
+class Command(BaseCommand):
+    help = 'Render and store the html of sections rendered with older templates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Render every section')
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        qs = Section.objects.with_images().order_by('pk')
+        if not options['all']:
+            qs = qs.exclude(renderer_version=get_renderer_version())
+
+        batch = []
+        count = failed = 0
+        site_ids = set()
+        for section in qs.iterator(chunk_size=batch_size):
+            if not section.set_rendered_html():
+                failed += 1
+
+            batch.append(section)
+            site_ids.add(section.site_id)
+            if len(batch) >= batch_size:
+                count += len(batch)
+                Section.objects.bulk_update(batch, FIELDS)
+                batch = []
+
+        if batch:
+            count += len(batch)
+            Section.objects.bulk_update(batch, FIELDS)
+
+        # bulk_update sends no signals
+        for site_id in site_ids:
+            invalidate_content(site_id)
+
+        self.stdout.write(f'Sections: {count} rendered, {failed} failed')
+        self.stdout.write(self.style.SUCCESS('Done'))
@@ -1,11 +1,15 @@
+import logging
 import threading
 
 from django.conf import settings
-from django.contrib.sites.models import Site
 from django.contrib.sites.middleware import CurrentSiteMiddleware
 from django.contrib.sites.shortcuts import get_current_site
 
-from .models.setting import SiteSetting
+from .cache import get_site_settings_snapshot
+from .queries import QueryRecorder
+from .storage import is_hashed_name
+
+logger = logging.getLogger(__name__)
 
 
 local = threading.local()
@@ -53,10 +57,6 @@ class SiteMiddleware(CurrentSiteMiddleware):
         if not site:
             return response
 
-        ctx['is_live'] = False
-
-        # SITE
-        site = Site.objects.filter(id=site.id).first()
         ctx['site'] = site
 
         # SHARED DATA
@@ -65,53 +65,12 @@ class SiteMiddleware(CurrentSiteMiddleware):
 
         sD = ctx.get('sharedData')
 
-        # SITE SETTING
-
-        settings = SiteSetting.objects.filter(site=site).first()
-        if settings:
-            ctx['is_live'] = settings.is_live
-            ctx['close_template'] = {
-                'html': settings.ct_html,
-                'title': settings.ct_title,
-                'text': settings.ct_text
-            }
-
-            if number := settings.contact_number:
-                ctx['contact_number'] = number
-                ctx['contact_number_display'] = settings.contact_number_display or number
-                ctx['contact_number_title'] = settings.contact_number_title or ''
-
-                sD['contact_number'] = number
-                sD['contact_number_display'] = settings.contact_number_display or number
-                sD['contact_number_title'] = settings.contact_number_title or ''
-
-            if email := settings.contact_email:
-                ctx['contact_email'] = email
-
-            if number := settings.whatsapp_number:
-                title = settings.whatsapp_link_title or ''
-                link = settings.whatsapp_link or ''
-
-                ctx['whatsapp_number'] = number
-                ctx['whatsapp_link'] = link
-                ctx['whatsapp_link_title'] = title
-
-                sD['whatsapp_number'] = number
-                sD['whatsapp_link'] = link
-                sD['whatsapp_link_title'] = title
+        # SITE SETTING (cached snapshot)
+        snapshot = get_site_settings_snapshot(site)
+        for key, value in snapshot['context'].items():
+            ctx[key] = {**value} if isinstance(value, dict) else value
 
-            if ga := settings.ga_tracking:
-                ctx['ga_tracking'] = ga.strip()
-
-            if fb := settings.fb_pixel:
-                ctx['fb_pixel'] = fb.strip()
-            if fb := settings.fb_app_id:
-                ctx['fb_app_id'] = fb.strip()
-                sD['fb_app_id'] = fb.strip()
-
-            if fb := settings.fb_app_secret:
-                ctx['fb_app_secret'] = fb.strip()
-                sD['fb_app_secret'] = fb.strip()
+        sD.update(snapshot['shared_data'])
 
         display_live = ctx.get('is_live', False) is True or request.path == '/login/'
 
@@ -155,3 +114,56 @@ class CORSMiddleware(object):
             response["Access-Control-Allow-Methods"] = "OPTIONS, GET, POST, PUT, DELETE, PATCH"
             response["Access-Control-Max-Age"] = 86400
             response["Access-Control-Allow-Credentials"] = 'true'
+
+
+class QueryCountMiddleware(object):
+    """
+    Reports the queries of each request, add it to MIDDLEWARE to opt in.
+
+    Active when settings.DEBUG or settings.MIQ_QUERY_COUNT is True:
+    - X-Query-Count, X-Query-Time (ms) and X-Query-Duplicates headers
+    - a warning log above settings.MIQ_QUERY_COUNT_WARN queries (default 50)
+      or when statements are repeated
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'MIQ_QUERY_COUNT', settings.DEBUG):
+            return self.get_response(request)
+
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+
+        duplicates = recorder.duplicates
+        response['X-Query-Count'] = recorder.count
+        response['X-Query-Time'] = f'{recorder.time * 1000:.1f}'
+        response['X-Query-Duplicates'] = sum(count - 1 for count in duplicates.values())
+
+        if recorder.count > getattr(settings, 'MIQ_QUERY_COUNT_WARN', 50) or duplicates:
+            logger.warning(f'{request.method} {request.path}: {recorder.get_report()}')
+
+        return response
+
+
+class StaticCacheMiddleware(object):
+    """
+    Far future, immutable Cache-Control of hashed static files
+    (storage.ManifestStaticStorage) when they are served by django.
+    Other static files are left to revalidate.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.status_code == 200 \
+                and request.path.startswith(settings.STATIC_URL) \
+                and is_hashed_name(request.path):
+            max_age = getattr(settings, 'MIQ_STATIC_MAX_AGE', 60 * 60 * 24 * 365)
+            response['Cache-Control'] = f'public, max-age={max_age}, immutable'
+
+        return response
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:36
+
+from django.db import migrations, models
+
+
+def mark_existing_ready(apps, schema_editor):
+    # Rows created before the pipeline already have their derivatives
+    Image = apps.get_model('core', 'Image')
+    Image.objects.update(status='READY')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_sitesetting_whatsapp_number'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Attempts'),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='error',
+            field=models.TextField(blank=True, verbose_name='Error'),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('READY', 'Ready'), ('FAILED', 'Failed')], db_index=True, default='PENDING', max_length=20, verbose_name='Status'),
+        ),
+        migrations.RunPython(mark_existing_ready, migrations.RunPython.noop),
+    ]
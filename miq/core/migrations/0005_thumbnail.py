@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:39
+
+import django.db.models.deletion
+import miq.core.models.image
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_image_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Thumbnail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(default=uuid.uuid4, editable=False, max_length=100, unique=True)),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='creation date and time')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='update date and time')),
+                ('spec', models.CharField(max_length=50, verbose_name='Rendition')),
+                ('signature', models.CharField(max_length=12)),
+                ('src', models.ImageField(max_length=500, upload_to=miq.core.models.image.upload_rendition_to, verbose_name='Thumbnail')),
+                ('image', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='thumbnails', to='core.image', verbose_name='Original Image')),
+            ],
+            options={
+                'verbose_name': 'Thumbnail',
+                'verbose_name_plural': 'Thumbnails',
+                'ordering': ('-updated', '-created'),
+                'constraints': [models.UniqueConstraint(fields=('image', 'spec'), name='unique_image_thumbnail_spec')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_thumbnail'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='thumbnail',
+            name='unique_image_thumbnail_spec',
+        ),
+        migrations.AddField(
+            model_name='thumbnail',
+            name='format',
+            field=models.CharField(default='png', max_length=10, verbose_name='Format'),
+            preserve_default=False,
+        ),
+        migrations.AddConstraint(
+            model_name='thumbnail',
+            constraint=models.UniqueConstraint(fields=('image', 'spec', 'format'), name='unique_image_thumbnail_spec'),
+        ),
+    ]
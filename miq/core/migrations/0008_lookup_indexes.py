@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_image_dimensions'),
+        ('sites', '0002_alter_domain_unique'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='section',
+            name='source',
+            field=models.SlugField(blank=True, db_index=False, max_length=100, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='image',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user', 'position'], name='image_active_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='image',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['site', 'position'], name='image_active_site_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='section',
+            index=models.Index(fields=['source', 'position'], name='section_source_position_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='section',
+            name='rendered_html',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='renderer_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
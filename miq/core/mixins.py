@@ -1,7 +1,13 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
 from django.conf import settings
+from django.core.cache import cache
 from django.http import HttpResponse
+from django.utils.safestring import mark_safe
 from django.template import Context, Template
-from django.template.loader import render_to_string
+from django.template.loader import get_template
 from django.contrib.auth.mixins import LoginRequiredMixin
 
 
@@ -13,13 +19,102 @@ class ModelSerializerMixin:
             return None
 
 
+class CompiledTemplateCache:
+    """
+    Bounded LRU of the Template objects compiled from inline sources,
+    keyed by the hash of the source
+    """
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self.templates = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, source: str) -> Template:
+        key = hashlib.sha1(source.encode()).hexdigest()
+        with self.lock:
+            if (template := self.templates.get(key)) is not None:
+                self.templates.move_to_end(key)
+                return template
+
+        template = Template(source)
+        with self.lock:
+            self.templates[key] = template
+            while len(self.templates) > self.max_size:
+                self.templates.popitem(last=False)
+        return template
+
+    def clear(self):
+        with self.lock:
+            self.templates.clear()
+
+
+inline_templates = CompiledTemplateCache(getattr(settings, 'MIQ_TEMPLATE_CACHE_SIZE', 128))
+
+
+def render_template(template_name: str, context: dict = None) -> str:
+    """
+    Renders a template file (cached by the template loaders)
+    or an inline template source (cached in inline_templates)
+    """
+
+    context = context or {}
+    if '.html' in template_name:
+        return get_template(template_name).render(context)
+
+    return inline_templates.get(str(template_name)).render(Context(context))
+
+
+def get_template_hash(template_name: str) -> str:
+    """
+    Hash of the template source, changes when a deploy edits the template
+    """
+
+    source = str(template_name)
+    if '.html' in source:
+        source = get_template(source).template.source
+    return hashlib.md5(source.encode()).hexdigest()
+
+
 class RendererMixin:
+    """
+    Renders model instances with templates. Fragments rendered with
+    _render_cached are cached under the slug and `updated` of the
+    instance and the template source, a save or a template change
+    changes the key.
+    """
+
     def _render(self, template_name: str, context: dict = {}):
+        return render_template(template_name, context)
+
+    def _render_cached(self, template_name: str, get_context):
+        """
+        get_context is only called on cache misses
+        """
+
+        key = self.get_fragment_cache_key(template_name)
+        if key and (html := cache.get(key)) is not None:
+            return mark_safe(html)
+
+        html = self._render(template_name, get_context())
+        if key:
+            cache.set(key, str(html), getattr(settings, 'MIQ_FRAGMENT_CACHE_TIMEOUT', 60 * 60 * 24))
+        return html
+
+    def get_fragment_cache_key(self, template_name: str):
+        if not getattr(settings, 'MIQ_FRAGMENT_CACHE', True):
+            return
+
+        slug = getattr(self, 'slug', None)
+        updated = getattr(self, 'updated', None)
+        if not slug or not updated:
+            return
 
-        if '.html' in template_name:
-            return render_to_string(template_name, context)
+        template = get_template_hash(template_name)
+        return f'miq:fragment:{self._meta.label_lower}:{slug}:{updated.timestamp()}:{template}'
 
-        return Template(str(template_name)).render(Context(context))
+    def get_rendered_html(self):
+        return self.render()
 
 
 class DevLoginRequiredMixin(LoginRequiredMixin):
@@ -5,7 +5,7 @@ from django.utils.translation import gettext_lazy as _
 from ..utils import get_text_choices
 
 from .user import User, UserGender, UserQuerySet, UserManager
-from .image import Image
+from .image import Image, ImageStatus, Thumbnail
 from .file import File
 from .page import Index, Page
 from .setting import SiteSetting
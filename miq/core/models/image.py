@@ -1,10 +1,18 @@
 import os
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
 
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.images import get_image_dimensions
 from django.db.models.functions import Concat
-from django.db.models import CharField, Value
-from django.db import models
+from django.db.models import CharField, Value, F, Q
+from django.db import models, transaction, IntegrityError
 from django.contrib.sites.models import Site
 
+from django.urls import reverse
+from django.utils import timezone
 from django.utils.text import Truncator
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
@@ -12,8 +20,10 @@ from django.template.defaultfilters import filesizeformat
 
 from ..mixins import RendererMixin
 from ..middleware import local
-from ..utils import get_image_files_path, img_file_from_pil, get_file_ext
-from ..utils_img import get_thumbnail, crop_img_to_square
+from ..utils import get_image_files_path
+from ..utils_img import make_derivatives, get_ext_filename
+from ..renditions import MIME_TYPES, get_source_formats, get_source_renditions
+from ..renditions import get_rendition, get_rendition_signature, get_image_fields_specs
 
 from .mixins import BaseModelMixin
 
@@ -29,6 +39,19 @@ def upload_thumb_to(instance, filename):
     return f'images/thumbs/{filename}'
 
 
+class ImageStatus(models.TextChoices):
+    PENDING = 'PENDING', _('Pending')
+    PROCESSING = 'PROCESSING', _('Processing')
+    READY = 'READY', _('Ready')
+    FAILED = 'FAILED', _('Failed')
+
+
+def get_stale_q(timeout=None):
+    if timeout is None:
+        timeout = getattr(settings, 'MIQ_IMAGE_PROCESSING_TIMEOUT', 600)
+    return Q(status=ImageStatus.PROCESSING, updated__lt=timezone.now() - timedelta(seconds=timeout))
+
+
 class ImageQeryset(models.QuerySet):
 
     def site(self, site):
@@ -40,6 +63,27 @@ class ImageQeryset(models.QuerySet):
     def active(self):
         return self.filter(is_active=True)
 
+    def pending(self):
+        return self.filter(status=ImageStatus.PENDING)
+
+    def failed(self):
+        return self.filter(status=ImageStatus.FAILED)
+
+    def with_renditions(self):
+        """
+        Prefetches the stored renditions, get_sources() then
+        links them from storage without a query
+        """
+
+        return self.prefetch_related('thumbnails')
+
+    def stale(self, timeout=None):
+        """
+        Images left processing for more than timeout seconds, their worker died
+        """
+
+        return self.filter(get_stale_q(timeout))
+
     def delete(self, *args, **kwargs):
         paths = []
         if self.exists():
@@ -73,6 +117,84 @@ class ImageManager(models.Manager):
     def active(self):
         return self.get_queryset().active()
 
+    def pending(self):
+        return self.get_queryset().pending()
+
+    def failed(self):
+        return self.get_queryset().failed()
+
+    def with_renditions(self):
+        return self.get_queryset().with_renditions()
+
+    def stale(self, timeout=None):
+        return self.get_queryset().stale(timeout)
+
+    def claim(self, pk, *, stale_after=None) -> bool:
+        """
+        Marks a pending or failed image as processing, or one left
+        processing for more than stale_after seconds.
+        Returns False if another worker already claimed it.
+        """
+
+        q = Q(status__in=[ImageStatus.PENDING, ImageStatus.FAILED])
+        if stale_after is not None:
+            q |= get_stale_q(stale_after)
+
+        # updated marks the claim, stale() measures from it
+        return self.get_queryset().filter(q, pk=pk).update(
+            status=ImageStatus.PROCESSING, attempts=F('attempts') + 1,
+            updated=timezone.now()
+        ) > 0
+
+    def bulk_create_from_files(self, files: list, **fields):
+        """
+        Validates and stores files across a bounded worker pool,
+        then inserts the valid ones with a single bulk_create.
+
+        Returns a list of (image, errors) in the order of files
+        """
+
+        workers = getattr(settings, 'MIQ_IMAGE_BULK_WORKERS', 4)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda file: self.prepare_from_file(file, **fields), files))
+
+        images = [img for img, errors in results if img]
+        if images:
+            self.bulk_create(images)
+
+            from ..pipeline import get_pipeline
+
+            pks = [img.pk for img in images if img.pk]
+
+            def dispatch():
+                pipeline = get_pipeline()
+                for pk in pks:
+                    pipeline.dispatch(pk)
+
+            transaction.on_commit(dispatch)
+
+        return results
+
+    def prepare_from_file(self, file, **fields):
+        """
+        Returns an unsaved image whose src is written to storage, or its errors
+        """
+
+        if not file:
+            return None, []
+
+        try:
+            forms.ImageField().clean(file)
+        except ValidationError as e:
+            return None, e.messages
+
+        img = self.model(**fields, status=ImageStatus.PENDING)
+        width, height = get_image_dimensions(file)
+        img.set_file_meta('src', width, height, file.size)
+        img.src.save(os.path.basename(file.name), file, save=False)
+        return img, None
+
     def get_queryset(self, *args, **kwargs):
         return ImageQeryset(self.model, *args, using=self._db, **kwargs)
 
@@ -111,17 +233,47 @@ class Image(RendererMixin, BaseModelMixin):
         upload_to=upload_thumb_to,
         null=True, blank=True)
 
+    # Files dimensions and sizes in bytes, set when the files are written
+    src_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    src_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    src_bytes = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    src_mobile_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    src_mobile_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    src_mobile_bytes = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    thumb_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    thumb_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    thumb_bytes = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    thumb_sq_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    thumb_sq_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    thumb_sq_bytes = models.PositiveIntegerField(null=True, blank=True, editable=False)
+
     caption = models.CharField(max_length=400, blank=True)
     alt_text = models.CharField(max_length=400, blank=True)
     is_active = models.BooleanField(default=True)
     position = models.PositiveIntegerField(default=1)
 
+    # Derivatives processing
+    status = models.CharField(
+        _("Status"), max_length=20, db_index=True,
+        choices=ImageStatus.choices, default=ImageStatus.PENDING)
+    attempts = models.PositiveSmallIntegerField(_("Attempts"), default=0)
+    error = models.TextField(_("Error"), blank=True)
+
     objects = ImageManager()
 
     class Meta:
         ordering = ('position', '-updated', '-created')
         verbose_name = _('Image')
         verbose_name_plural = _('Images')
+        indexes = [
+            # Active images of a user or a site, by position
+            models.Index(
+                fields=['user', 'position'], name='image_active_user_idx',
+                condition=models.Q(is_active=True)),
+            models.Index(
+                fields=['site', 'position'], name='image_active_site_idx',
+                condition=models.Q(is_active=True)),
+        ]
 
     def __str__(self):
         return f'{self.src}'
@@ -136,21 +288,139 @@ class Image(RendererMixin, BaseModelMixin):
             if user.is_authenticated:
                 self.user = user
 
-        if not self.pk:
-            filename = self.src.url.split('/')[-1]  # type: str
-            ext = get_file_ext(self.src.path)  # type: str
-            if isinstance(ext, str) and ext.startswith('.'):
-                ext = ext[1:]
+        is_new = not self.pk
+        if is_new:
+            self.status = ImageStatus.PENDING
 
-            thumb = img_file_from_pil(get_thumbnail(file=self.src))
-            self.src_mobile.save(filename, thumb, save=False)
-            self.thumb.save(filename, thumb, save=False)
-
-            crop = crop_img_to_square(file=self.thumb)
-            self.thumb_sq.save(filename, img_file_from_pil(crop), save=False)
+        if self.src and not self.src._committed:
+            # Read from the upload, before it is written to storage
+            self.set_file_meta('src', self.src.width, self.src.height, self.src.size)
 
         super().save(*args, **kwargs)
 
+        if is_new:
+            from ..pipeline import get_pipeline
+
+            pk = self.pk
+            transaction.on_commit(lambda: get_pipeline().dispatch(pk))
+
+    def generate_derivatives(self):
+        """
+        Builds src_mobile, thumb and thumb_sq from src then marks the image as ready
+        """
+
+        root = os.path.splitext(os.path.basename(self.src.name))[0]
+
+        with self.src.open('rb') as src:
+            derivatives = make_derivatives(src, get_image_fields_specs())
+
+        for field, derivative in derivatives.items():
+            getattr(self, field).save(
+                get_ext_filename(root, derivative.format), derivative.file, save=False)
+            self.set_file_meta(
+                field, derivative.width, derivative.height, derivative.file.size)
+
+        # Before the save re-renders the sections of the image
+        self.generate_sources()
+
+        self.status = ImageStatus.READY
+        self.error = ''
+        self.save(update_fields=[
+            *derivatives.keys(), *self.get_file_meta_fields(*derivatives.keys()),
+            'status', 'error', 'updated'
+        ])
+
+    def generate_sources(self):
+        """
+        Stores the renditions of get_sources(), pages then link
+        them from storage instead of the rendition view
+        """
+
+        for name in get_source_renditions():
+            for ext in get_source_formats():
+                self.get_rendition(name, ext)
+
+        getattr(self, '_prefetched_objects_cache', {}).pop('thumbnails', None)
+
+    def set_file_meta(self, field, width, height, size):
+        setattr(self, f'{field}_width', width)
+        setattr(self, f'{field}_height', height)
+        setattr(self, f'{field}_bytes', size)
+
+    @staticmethod
+    def get_file_meta_fields(*fields):
+        return [
+            f'{field}_{meta}'
+            for field in fields for meta in ('width', 'height', 'bytes')
+        ]
+
+    def get_rendition(self, name: str, ext: str = None):
+        """
+        Returns the named Thumbnail in the given format (defaults to the spec format),
+        generating it on first use
+        """
+
+        spec = get_rendition(name, ext)
+        if not spec:
+            raise KeyError(f'Unknown rendition: {name}')
+
+        thumb = None
+        for obj in self.thumbnails.all():
+            if obj.spec == name and obj.format == spec.format:
+                thumb = obj
+
+        if not thumb or thumb.is_stale:
+            thumb = Thumbnail.objects.generate(self, name, spec.format)
+        return thumb
+
+    def get_rendition_url(self, name: str, ext: str = None):
+        """
+        Stored rendition url if thumbnails were prefetched,
+        otherwise the url of the view generating it on demand.
+        """
+
+        spec = get_rendition(name, ext)
+        prefetched = getattr(self, '_prefetched_objects_cache', {}).get('thumbnails')
+        for thumb in prefetched or []:
+            if thumb.spec == name and thumb.format == spec.format and not thumb.is_stale:
+                return thumb.src.url
+
+        if ext:
+            return reverse('core:image-rendition-format', args=[self.slug, name, ext])
+        return reverse('core:image-rendition', args=[self.slug, name])
+
+    def get_sources(self, name: str):
+        """
+        <picture> sources of a rendition in modern formats, best first
+        """
+
+        return [
+            {'type': MIME_TYPES[ext], 'srcset': self.get_rendition_url(name, ext)}
+            for ext in get_source_formats()
+        ]
+
+    def mark_failed(self, error):
+        self.status = ImageStatus.FAILED
+        self.error = f'{error}'
+        self.save(update_fields=['status', 'error', 'updated'])
+
+    def retry(self):
+        """
+        Sends a failed image back to the derivative pipeline
+        """
+
+        from ..pipeline import get_pipeline
+
+        self.status = ImageStatus.PENDING
+        self.save(update_fields=['status', 'updated'])
+
+        pk = self.pk
+        transaction.on_commit(lambda: get_pipeline().dispatch(pk))
+
+    @property
+    def is_ready(self):
+        return self.status == ImageStatus.READY
+
     @property
     def name_truncated(self):
         return Truncator(self.name).chars(30)
@@ -161,60 +431,55 @@ class Image(RendererMixin, BaseModelMixin):
 
     @property
     def width(self):
-        return self.src.width
+        return self.src_width
 
     @property
     def height(self):
-        return self.src.height
+        return self.src_height
 
     @property
     def size(self):
-        return filesizeformat(self.src.size)
+        if self.src_bytes is not None:
+            return filesizeformat(self.src_bytes)
 
     @property
     def width_mobile(self):
-        if self.src_mobile:
-            return self.src_mobile.width
+        return self.src_mobile_width
 
     @property
     def height_mobile(self):
-        if self.src_mobile:
-            return self.src_mobile.height
+        return self.src_mobile_height
 
     @property
     def size_mobile(self):
-        if self.src_mobile:
-            return filesizeformat(self.src_mobile.size)
+        if self.src_mobile_bytes is not None:
+            return filesizeformat(self.src_mobile_bytes)
 
     @property
     def width_thumb(self):
-        if self.thumb:
-            return self.thumb.width
+        return self.thumb_width
 
     @property
     def height_thumb(self):
-        if self.thumb:
-            return self.thumb.height
+        return self.thumb_height
 
     @property
     def size_thumb(self):
-        if self.thumb:
-            return filesizeformat(self.thumb.size)
+        if self.thumb_bytes is not None:
+            return filesizeformat(self.thumb_bytes)
 
     @property
     def width_thumb_sq(self):
-        if self.thumb_sq:
-            return self.thumb_sq.width
+        return self.thumb_sq_width
 
     @property
     def height_thumb_sq(self):
-        if self.thumb_sq:
-            return self.thumb_sq.height
+        return self.thumb_sq_height
 
     @property
     def size_thumb_sq(self):
-        if self.thumb_sq:
-            return filesizeformat(self.thumb_sq.size)
+        if self.thumb_sq_bytes is not None:
+            return filesizeformat(self.thumb_sq_bytes)
 
     def to_json(self):
         """Serialize an image"""
@@ -228,31 +493,36 @@ class Image(RendererMixin, BaseModelMixin):
 
         if self.src_mobile:
             data['src_mobile'] = f'{self.src_mobile.url}'
-            data['src_mobile_width'] = self.src_mobile.width
-            data['src_mobile_height'] = self.src_mobile.height
+            data['src_mobile_width'] = self.src_mobile_width
+            data['src_mobile_height'] = self.src_mobile_height
 
         if self.thumb:
             data['thumb'] = f'{self.thumb.url}'
-            data['thumb_width'] = self.thumb.width
-            data['thumb_height'] = self.thumb.height
+            data['thumb_width'] = self.thumb_width
+            data['thumb_height'] = self.thumb_height
 
         if self.thumb_sq:
             data['thumb_sq'] = f'{self.thumb_sq.url}'
-            data['thumb_sq_width'] = self.thumb_sq.width
-            data['thumb_sq_height'] = self.thumb_sq.height
+            data['thumb_sq_width'] = self.thumb_sq_width
+            data['thumb_sq_height'] = self.thumb_sq_height
+
+        data['sources'] = {
+            'thumb': self.get_sources('thumb'),
+            'thumb_sq': self.get_sources('thumb_sq'),
+        }
 
         return data
 
     def render_thumb_sq(self):
-        return self._render(
+        return self._render_cached(
             'core/components/img-square.html',
-            context={'img': self, **self.to_json()}
+            lambda: {'img': self, **self.to_json()}
         )
 
     def render(self):
-        return self._render(
+        return self._render_cached(
             'core/components/img.html',
-            context={'img': self, **self.to_json()}
+            lambda: {'img': self, **self.to_json()}
         )
 
     def deactivate(self):
@@ -260,31 +530,91 @@ class Image(RendererMixin, BaseModelMixin):
         self.save()
 
 
-# Thumbnail
-# Sizes
+"""
+# THUMBNAIL
+"""
+
+
+def upload_rendition_to(instance, filename):
+    return f'images/thumbs/{instance.spec}/{filename}'
+
+
+class ThumbnailManager(models.Manager):
 
+    def generate(self, image, name: str, ext: str = None):
+        """
+        Builds the named rendition of an image in the given format,
+        or refreshes it if the spec has changed since it was stored.
+        """
 
-# class Thumbnail(RendererMixin, BaseModelMixin):
-#     class Meta:
-#         ordering = ('-updated', '-created')
-#         verbose_name = _('Thumbnail')
-#         verbose_name_plural = _('Thumbnails')
+        spec = get_rendition(name, ext)
+        if not spec:
+            raise KeyError(f'Unknown rendition: {name}')
 
-#     def __str__(self):
-#         return f'{self.src}'
+        with image.src.open('rb') as src:
+            derivative = make_derivatives(src, {name: spec})[name]
 
-#     image = models.ForeignKey(
-#         "core.Image",
-#         verbose_name=_("Original Image"),
-#         on_delete=models.CASCADE,
-#         related_name='thumbnails'
-#     )
+        lookup = {'image': image, 'spec': name, 'format': spec.format}
+        thumb = self.filter(**lookup).first() or self.model(**lookup)
+        if thumb.src:
+            thumb.src.delete(save=False)
 
-#     src = models.ImageField(
-#         max_length=500,
-#         verbose_name="Thumbnail",
-#         help_text="Select an image file",
-#         upload_to=upload_thumb_to,
-#         null=True, blank=True
-#     )
-#     is_square = models.BooleanField(default=False)
+        root = os.path.splitext(os.path.basename(image.src.name))[0]
+        thumb.signature = get_rendition_signature(spec)
+        thumb.src.save(get_ext_filename(root, derivative.format), derivative.file, save=False)
+        thumb.width = derivative.width
+        thumb.height = derivative.height
+        thumb.bytes = derivative.file.size
+
+        try:
+            with transaction.atomic():
+                thumb.save()
+        except IntegrityError:
+            # Generated concurrently by another request
+            thumb.src.delete(save=False)
+            return self.get(**lookup)
+
+        return thumb
+
+
+class Thumbnail(BaseModelMixin):
+    """
+    Stored rendition of an Image, one per (image, spec, format)
+    """
+
+    image = models.ForeignKey(
+        'core.Image',
+        verbose_name=_("Original Image"),
+        on_delete=models.CASCADE,
+        related_name='thumbnails'
+    )
+    spec = models.CharField(_("Rendition"), max_length=50)
+    format = models.CharField(_("Format"), max_length=10)
+    signature = models.CharField(max_length=12)
+
+    src = models.ImageField(
+        max_length=500,
+        verbose_name="Thumbnail",
+        upload_to=upload_rendition_to)
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    bytes = models.PositiveIntegerField(null=True, blank=True, editable=False)
+
+    objects = ThumbnailManager()
+
+    class Meta:
+        ordering = ('-updated', '-created')
+        verbose_name = _('Thumbnail')
+        verbose_name_plural = _('Thumbnails')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['image', 'spec', 'format'], name='unique_image_thumbnail_spec')
+        ]
+
+    def __str__(self):
+        return f'{self.src}'
+
+    @property
+    def is_stale(self):
+        spec = get_rendition(self.spec, self.format)
+        return not spec or self.signature != get_rendition_signature(spec)
@@ -1,4 +1,8 @@
 
+import logging
+
+from django.conf import settings
+from django.utils import timezone
 from django.utils.safestring import mark_safe
 from django.db import models
 from django.contrib.sites.models import Site
@@ -28,10 +32,23 @@ class SectionType(models.TextChoices):
     EMBED = 'EMBED', _('Embed')
 
 
+logger = logging.getLogger(__name__)
+
 RENDERER_TEMPLATES = {
-    SectionType.HGAL: 'miq/components/img-gallery-horizontal.html',
-    SectionType.TXT: '',
+    SectionType.IMG: 'core/components/section-img.html',
+    SectionType.VGAL: 'core/components/section-img.html',
+    SectionType.HGAL: 'core/components/img-gallery-horizontal.html',
+    SectionType.SQGRID: 'core/components/img-square-grid.html',
+    SectionType.SLIDER: 'core/components/img-slider.html',
 }
+DEFAULT_RENDERER_TEMPLATE = 'core/components/section-html.html'
+
+# Bump when the section templates change, then run `manage.py render_sections`
+RENDERER_VERSION = 1
+
+
+def get_renderer_version() -> int:
+    return getattr(settings, 'MIQ_SECTION_RENDERER_VERSION', RENDERER_VERSION)
 
 
 class SectionAbstract(BaseModelMixin):
@@ -47,9 +64,57 @@ class SectionAbstract(BaseModelMixin):
 
 # SECTION
 
+def get_images_prefetch(renditions=True) -> models.Prefetch:
+    from .image import Image
+
+    queryset = Image.objects.with_renditions() if renditions else Image.objects.all()
+    return models.Prefetch(
+        'images', queryset=queryset.select_related('user').order_by('position', 'pk'))
+
+
+def prefetch_section_images(sections, renditions=True):
+    """
+    Loads the images of every section in one query, and their
+    renditions (the <picture> sources) in another unless disabled
+    """
+
+    sections = [
+        section for section in sections
+        if 'images' not in getattr(section, '_prefetched_objects_cache', {})]
+    if sections:
+        models.prefetch_related_objects(sections, get_images_prefetch(renditions))
+
+
+class SectionQueryset(models.QuerySet):
+    def with_images(self):
+        """
+        Prefetches the images by position, section.ordered_images
+        and section.image then run no query
+        """
+
+        return self.prefetch_related(get_images_prefetch())
+
+    def for_render(self):
+        """
+        Sections shown through get_rendered_html: the stored html needs
+        no image, they are only prefetched when some html is outdated
+        and rendered live
+        """
+
+        if self.exclude(renderer_version=get_renderer_version()).exists():
+            return self.with_images()
+        return self
+
+
 class SectionManager(models.Manager):
+    def with_images(self):
+        return self.get_queryset().with_images()
+
+    def for_render(self):
+        return self.get_queryset().for_render()
+
     def get_queryset(self):
-        return super().get_queryset().prefetch_related('images')
+        return SectionQueryset(self.model, using=self._db)
 
 
 class Section(RendererMixin, SectionAbstract):
@@ -58,6 +123,10 @@ class Section(RendererMixin, SectionAbstract):
         verbose_name = _('Section')
         verbose_name_plural = _('Sections')
         ordering = ('created', 'position')
+        indexes = [
+            # Sections of a page, by position
+            models.Index(fields=['source', 'position'], name='section_source_position_idx'),
+        ]
 
     def __str__(self):
         return f'{self.pk}-{self.type}'
@@ -70,7 +139,7 @@ class Section(RendererMixin, SectionAbstract):
 
     # Used to group sections
     source = models.SlugField(
-        max_length=100, db_index=True,
+        max_length=100, db_index=False,
         null=True, blank=True)
 
     type = models.CharField(
@@ -88,27 +157,78 @@ class Section(RendererMixin, SectionAbstract):
 
     position = models.PositiveIntegerField(default=1)
 
+    # Final html, rendered on save
+    rendered_html = models.TextField(blank=True, default='', editable=False)
+    renderer_version = models.PositiveIntegerField(default=0, editable=False)
+
     objects = SectionManager()
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.materialize()
+
     @property
-    def image(self):
-        if self.images.exists():
-            return self.images.order_by('position').first()
+    def ordered_images(self) -> list:
+        """
+        Images by position with their renditions, prefetched on first use
+        """
 
-    def render(self):
-        # DONOT USE: EXPERIMENTAL CODE
+        prefetch_section_images([self])
+        return list(self.images.all())
+
+    @property
+    def image(self):
+        if images := self.ordered_images:
+            return images[0]
+
+    def render(self) -> str:
+        return self._render(
+            RENDERER_TEMPLATES.get(self.type, DEFAULT_RENDERER_TEMPLATE),
+            context={
+                'section': self, 'images': self.ordered_images,
+                'type': self.type
+            }
+        )
+
+    def set_rendered_html(self) -> bool:
+        """
+        Renders the html to store, left empty (rendered live)
+        when rendering fails
+        """
 
-        html = mark_safe(self.html)
         try:
-            return self._render(
-                RENDERER_TEMPLATES.get(self.type, '<div></div>'),
-                context={
-                    'section': self, 'images': self.images.all,
-                    'type': self.type
-                }
-            )
+            self.rendered_html = self.render()
+            self.renderer_version = get_renderer_version()
+            return True
         except Exception:
-            return html
+            logger.exception('Section %s could not be rendered', self.pk)
+            self.rendered_html = ''
+            self.renderer_version = 0
+            return False
+
+    def materialize(self) -> bool:
+        """
+        Renders and stores the html of the section, a new html
+        also changes `updated`, the key of cached fragments
+        """
+
+        previous = self.rendered_html
+        rendered = self.set_rendered_html()
+        fields = {'rendered_html': self.rendered_html, 'renderer_version': self.renderer_version}
+        if self.rendered_html != previous:
+            self.updated = fields['updated'] = timezone.now()
+
+        Section.objects.filter(pk=self.pk).update(**fields)
+
+        # update() sends no signal, pages cached since the save had the old html
+        from ..cache import invalidate_content
+        invalidate_content(self.site_id)
+        return rendered
+
+    def get_rendered_html(self):
+        if self.renderer_version == get_renderer_version():
+            return mark_safe(self.rendered_html)
+        return self.render()
 
 
 class SectionImage(SectionAbstract):
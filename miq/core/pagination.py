@@ -1,5 +1,17 @@
+import json
+import base64
+import operator
+from functools import reduce
+
+from django.db.models import Q
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.translation import gettext_lazy as _
+
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.pagination import BasePagination, PageNumberPagination
+
 from .serializers import serialize_context_pagination
 
 
@@ -21,3 +33,114 @@ class MiqPageNumberPagination(PageNumberPagination):
         _r['is_drf'] = True
 
         return Response(_r)
+
+
+class MiqKeysetPagination(BasePagination):
+    """
+    Keyset pagination on `ordering`, which must end with a unique field.
+    Pages are found with a WHERE on the last row of the previous page,
+    no COUNT(*) or OFFSET: deep pages cost as much as the first one.
+
+    Cursors are opaque: ?cursor=<base64 of the row values and direction>
+    """
+
+    page_size = 16
+    ordering = ('-created', '-id')
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.model = queryset.model
+        self.has_next = self.has_previous = False
+
+        cursor = self.decode_cursor(request)
+        is_previous = bool(cursor and cursor[1])
+
+        ordering = self.ordering
+        if is_previous:
+            ordering = [self.reverse_field(field) for field in ordering]
+
+        queryset = queryset.order_by(*ordering)
+        if cursor:
+            queryset = queryset.filter(self.get_keyset_filter(ordering, cursor[0]))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if is_previous:
+            results.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = cursor is not None, has_more
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'is_paginated': self.has_next or self.has_previous,
+            'has_next': self.has_next,
+            'has_previous': self.has_previous,
+            'per_page': self.page_size,
+            'has_next_url': self.get_next_link(),
+            'has_previous_url': self.get_previous_link(),
+            'results': data,
+            'is_drf': True,
+        })
+
+    def get_next_link(self):
+        if self.has_next and self.page:
+            return self.get_link(self.page[-1], False)
+
+    def get_previous_link(self):
+        if self.has_previous and self.page:
+            return self.get_link(self.page[0], True)
+
+    def get_link(self, obj, is_previous: bool) -> str:
+        values = [self.get_value(obj, field) for field in self.ordering]
+        cursor = json.dumps([values, int(is_previous)], separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(cursor.encode()).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_value(self, obj, field):
+        value = getattr(obj, field.lstrip('-'))
+        return value.isoformat() if hasattr(value, 'isoformat') else value
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+
+        try:
+            values, is_previous = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            values = [
+                self.model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return values, is_previous
+
+    def get_keyset_filter(self, ordering, values) -> Q:
+        """
+        Rows after values in ordering:
+        (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+        """
+
+        conditions = []
+        equal = Q()
+        for field, value in zip(ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            conditions.append(equal & Q(**{f'{name}__{lookup}': value}))
+            equal &= Q(**{name: value})
+        return reduce(operator.or_, conditions)
+
+    def reverse_field(self, field: str) -> str:
+        return field[1:] if field.startswith('-') else f'-{field}'
@@ -0,0 +1,97 @@
+"""
+IMAGE DERIVATIVE PIPELINE
+
+Image rows are saved right away in a pending state, their derivatives
+(src_mobile, thumb, thumb_sq) are produced by the configured pipeline.
+
+settings.MIQ_IMAGE_PIPELINE:
+- 'miq.core.pipeline.ThreadPipeline' (default): background thread pool
+- 'miq.core.pipeline.SyncPipeline': in the saving process, after commit
+- 'miq.core.pipeline.QueuePipeline': rows stay pending until
+  `manage.py process_images` drains them
+
+Jobs of the thread pipeline live in the web process, they are lost when
+it exits (deploy, worker recycle). Run `manage.py process_images`
+periodically (cron) with any pipeline: it processes the pending rows and
+reclaims those left processing for more than
+settings.MIQ_IMAGE_PROCESSING_TIMEOUT seconds (default 600).
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PIPELINE = 'miq.core.pipeline.ThreadPipeline'
+
+_pipelines = {}
+
+
+def process_image(pk, stale_after=None) -> bool:
+    """
+    Claims a pending/failed image, or a stale processing one when
+    stale_after is set, and generates its derivatives.
+    Returns True when the image is ready.
+    """
+
+    from .models import Image
+
+    if not Image.objects.claim(pk, stale_after=stale_after):
+        return False
+
+    img = Image.objects.filter(pk=pk).first()
+    if not img:
+        return False
+
+    try:
+        img.generate_derivatives()
+    except Exception as e:
+        logger.exception(f'Image[{pk}] derivatives failed')
+        img.mark_failed(e)
+        return False
+
+    return True
+
+
+class BasePipeline:
+    def dispatch(self, pk):
+        raise NotImplementedError
+
+
+class SyncPipeline(BasePipeline):
+    def dispatch(self, pk):
+        return process_image(pk)
+
+
+class QueuePipeline(BasePipeline):
+    def dispatch(self, pk):
+        # Drained by the process_images management command
+        return None
+
+
+class ThreadPipeline(BasePipeline):
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'MIQ_IMAGE_PIPELINE_WORKERS', 2),
+            thread_name_prefix='miq-images')
+
+    def dispatch(self, pk):
+        return self.executor.submit(self.run, pk)
+
+    def run(self, pk):
+        close_old_connections()
+        try:
+            return process_image(pk)
+        finally:
+            close_old_connections()
+
+
+def get_pipeline() -> BasePipeline:
+    path = getattr(settings, 'MIQ_IMAGE_PIPELINE', DEFAULT_PIPELINE)
+    if path not in _pipelines:
+        _pipelines[path] = import_string(path)()
+    return _pipelines[path]
@@ -0,0 +1,64 @@
+"""
+QUERY RECORDING
+
+Counts and times the queries run on a connection, and finds repeated
+statements (same sql, any params), the usual sign of N+1 queries.
+
+with QueryRecorder() as recorder:
+    ...
+recorder.count, recorder.time, recorder.duplicates
+"""
+
+import time
+from collections import Counter
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class QueryRecorder:
+    def __init__(self, using: str = DEFAULT_DB_ALIAS):
+        self.connection = connections[using]
+        self.queries = []
+        self._wrapper = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    def __enter__(self):
+        self._wrapper = self.connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrapper.__exit__(*exc_info)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def time(self) -> float:
+        """
+        Seconds spent in the database
+        """
+
+        return sum(duration for sql, duration in self.queries)
+
+    @property
+    def duplicates(self) -> dict:
+        """
+        {sql: count} of the statements run more than once
+        """
+
+        counts = Counter(sql for sql, duration in self.queries)
+        return {sql: count for sql, count in counts.items() if count > 1}
+
+    def get_report(self) -> str:
+        lines = [f'{self.count} queries in {self.time * 1000:.1f}ms']
+        for sql, count in sorted(self.duplicates.items(), key=lambda item: -item[1]):
+            lines.append(f'{count}x {sql}')
+        return '\n'.join(lines)
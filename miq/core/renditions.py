@@ -0,0 +1,130 @@
+"""
+IMAGE RENDITIONS REGISTRY
+
+Named image sizes, generated on demand by the image-rendition view
+and stored in the Thumbnail table.
+
+Projects add or override renditions in settings:
+
+MIQ_IMAGE_RENDITIONS = {
+    'card': {'width': 600, 'height': 400, 'crop': 'fill', 'quality': {'webp': 75}},
+}
+
+Each rendition is also served in the modern formats of
+settings.MIQ_IMAGE_SOURCE_FORMATS, its own format is the fallback.
+"""
+
+import hashlib
+
+from django.conf import settings
+
+from .utils_img import RenditionSpec, THUMB_SPEC, THUMB_SQ_SPEC, supports_format
+
+SOURCE_FORMATS = ('avif', 'webp')
+
+MIME_TYPES = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+}
+
+_registry = {
+    'thumb': THUMB_SPEC,
+    'thumb_sq': THUMB_SQ_SPEC,
+}
+
+# Image fields generated at upload time, and the rendition they hold
+IMAGE_FIELDS_RENDITIONS = {
+    'src_mobile': 'thumb',
+    'thumb': 'thumb',
+    'thumb_sq': 'thumb_sq',
+}
+
+
+def make_spec(**spec) -> RenditionSpec:
+    # Specs are hashable, {format: quality} is stored as sorted pairs
+    if isinstance(quality := spec.get('quality'), dict):
+        spec['quality'] = tuple(sorted(quality.items()))
+    return RenditionSpec(**spec)
+
+
+def register_rendition(name: str, **spec) -> RenditionSpec:
+    _registry[name] = make_spec(**spec)
+    return _registry[name]
+
+
+def get_renditions() -> dict:
+    renditions = {**_registry}
+    for name, spec in getattr(settings, 'MIQ_IMAGE_RENDITIONS', {}).items():
+        renditions[name] = make_spec(**spec)
+    return renditions
+
+
+def get_rendition(name: str, ext: str = None) -> RenditionSpec:
+    spec = get_renditions().get(name)
+    if spec and ext:
+        spec = spec._replace(format=ext)
+    return spec
+
+
+def get_source_formats() -> list:
+    """
+    Modern formats to offer, best first, if Pillow can write them
+    """
+
+    formats = getattr(settings, 'MIQ_IMAGE_SOURCE_FORMATS', SOURCE_FORMATS)
+    return [ext for ext in formats if supports_format(ext)]
+
+
+def negotiate_format(accept: str, spec: RenditionSpec) -> str:
+    """
+    Picks the best source format accepted by the client (Accept header)
+    """
+
+    accept = accept or ''
+    for ext in get_source_formats():
+        if MIME_TYPES[ext] in accept:
+            return ext
+    return spec.format
+
+
+def get_source_renditions() -> list:
+    """
+    Renditions offered as <picture> sources, built with the derivatives
+    """
+
+    return sorted(set(IMAGE_FIELDS_RENDITIONS.values()))
+
+
+def get_rendition_signature(spec: RenditionSpec) -> str:
+    """
+    Changes whenever the spec changes, stored renditions
+    with another signature are regenerated.
+    """
+
+    return hashlib.md5(f'{tuple(spec)}'.encode()).hexdigest()[:12]
+
+
+def get_rendition_cache_key(site_id, slug, name: str, spec: RenditionSpec) -> str:
+    return f'miq:rendition:{site_id}:{slug}:{name}:{spec.format}:{get_rendition_signature(spec)}'
+
+
+def get_image_rendition_cache_keys(image) -> list:
+    """
+    Cache keys of every rendition url of image, in every format
+    """
+
+    keys = []
+    for name, spec in get_renditions().items():
+        for ext in {spec.format, *get_source_formats()}:
+            keys.append(get_rendition_cache_key(image.site_id, image.slug, name, spec._replace(format=ext)))
+    return keys
+
+
+def get_image_fields_specs() -> dict:
+    renditions = get_renditions()
+    return {
+        field: renditions[name]
+        for field, name in IMAGE_FIELDS_RENDITIONS.items()
+    }
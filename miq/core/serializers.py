@@ -1,7 +1,10 @@
 
+from django.db.models.manager import BaseManager
+
 from rest_framework import serializers
 
 from .models import Image
+from .models.section import prefetch_section_images
 
 
 def serialize_context_pagination(request, context):
@@ -61,3 +64,14 @@ class PublicImageSerializer(serializers.ModelSerializer):
     height = serializers.ReadOnlyField()
     width_mobile = serializers.ReadOnlyField()
     height_mobile = serializers.ReadOnlyField()
+
+
+class SectionListSerializer(serializers.ListSerializer):
+    """
+    Loads the images of all the sections in one query
+    """
+
+    def to_representation(self, data):
+        sections = list(data.all() if isinstance(data, BaseManager) else data)
+        prefetch_section_images(sections, renditions=False)
+        return super().to_representation(sections)
@@ -1,11 +1,16 @@
 import os
 
+from django.core.cache import cache
 from django.dispatch import receiver
 from django.db.models import signals
 from django.contrib.sites.models import Site
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
 
 from .utils import get_image_files_path
-from .models import Index, SiteSetting, Image
+from .models import Index, Page, Section, SectionImage, SiteSetting, Image, Thumbnail
+from .renditions import get_image_rendition_cache_keys, get_rendition, get_rendition_cache_key
+from .cache import invalidate_content, invalidate_permissions, invalidate_site_settings
 
 
 @receiver(signals.post_save, sender=Site)
@@ -19,6 +24,120 @@ def on_site_did_save(sender, instance, created, **kwargs):
 
 @receiver(signals.post_delete, sender=Image)
 def image_was_deleted(sender, instance, *args, **kwargs):
+    cache.delete_many(get_image_rendition_cache_keys(instance))
+
     for path in get_image_files_path(instance):
         if os.path.exists(path):
             os.remove(path)
+
+
+@receiver(signals.post_delete, sender=Thumbnail)
+def thumbnail_was_deleted(sender, instance, *args, **kwargs):
+    if instance.src:
+        instance.src.delete(save=False)
+
+    if spec := get_rendition(instance.spec, instance.format):
+        image = instance.image
+        cache.delete(get_rendition_cache_key(image.site_id, image.slug, instance.spec, spec))
+
+
+@receiver(signals.post_save, sender=Image)
+def image_did_deactivate(sender, instance, **kwargs):
+    if not instance.is_active:
+        cache.delete_many(get_image_rendition_cache_keys(instance))
+
+
+@receiver(signals.post_save, sender=Site)
+@receiver(signals.post_delete, sender=Site)
+def site_did_change(sender, instance, **kwargs):
+    invalidate_site_settings(instance.id)
+    invalidate_content(instance.id)
+
+
+@receiver(signals.post_save, sender=SiteSetting)
+@receiver(signals.post_delete, sender=SiteSetting)
+def site_setting_did_change(sender, instance, **kwargs):
+    invalidate_site_settings(instance.site_id)
+    invalidate_content(instance.site_id)
+
+
+@receiver(signals.post_save)
+@receiver(signals.post_delete)
+def content_did_change(sender, instance, **kwargs):
+    # Any sender, section proxies included
+    if isinstance(instance, (Index, Page, Section, Image)):
+        invalidate_content(instance.site_id)
+
+    elif isinstance(instance, SectionImage):
+        site_id = Section.objects.filter(pk=instance.section_id)\
+            .values_list('site_id', flat=True).first()
+        if site_id:
+            invalidate_content(site_id)
+
+
+@receiver(signals.m2m_changed, sender=Index.sections.through)
+@receiver(signals.m2m_changed, sender=Section.images.through)
+def content_relations_did_change(sender, instance, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate_content(instance.site_id)
+
+
+"""
+SECTION HTML
+"""
+
+
+def materialize_sections(sections):
+    for section in sections:
+        section.materialize()
+
+
+@receiver(signals.m2m_changed, sender=Section.images.through)
+def section_images_did_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+
+    if not reverse:
+        materialize_sections([instance])
+    elif pk_set:
+        materialize_sections(Section.objects.with_images().filter(pk__in=pk_set))
+
+
+@receiver(signals.post_save, sender=Image)
+def image_did_save(sender, instance, created, **kwargs):
+    if not created:
+        materialize_sections(Section.objects.with_images().filter(images=instance).distinct())
+
+
+@receiver(signals.post_save, sender=SectionImage)
+@receiver(signals.post_delete, sender=SectionImage)
+def section_image_did_change(sender, instance, **kwargs):
+    materialize_sections(Section.objects.filter(pk=instance.section_id))
+
+
+User = get_user_model()
+
+
+@receiver(signals.post_save, sender=Group)
+@receiver(signals.post_delete, sender=Group)
+@receiver(signals.post_save, sender=Permission)
+@receiver(signals.post_delete, sender=Permission)
+@receiver(signals.post_delete, sender=User)
+def permissions_did_change(sender, instance, **kwargs):
+    invalidate_permissions()
+
+
+@receiver(signals.post_save, sender=User)
+def user_did_save(sender, instance, update_fields=None, **kwargs):
+    # Logins only update last_login
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_permissions()
+
+
+@receiver(signals.m2m_changed, sender=Group.permissions.through)
+@receiver(signals.m2m_changed, sender=User.groups.through)
+@receiver(signals.m2m_changed, sender=User.user_permissions.through)
+def permission_relations_did_change(sender, instance, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate_permissions()
@@ -0,0 +1,44 @@
+"""
+STATIC FILES
+
+Static file names carry a hash of their content (core.3f2a9c1e5b7d.css),
+a new deploy changes the url of the changed files only, they can be
+cached forever:
+
+STORAGES = {
+    ...,
+    'staticfiles': {'BACKEND': 'miq.core.storage.ManifestStaticStorage'},
+}
+"""
+
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+# name.<hash>.ext, from the manifest (12) or the client build (8)
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{8,32}\.[\w.]+$')
+
+
+class ManifestStaticStorage(ManifestStaticFilesStorage):
+    # Files missing from the manifest keep their name instead of raising
+    manifest_strict = False
+
+
+def is_hashed_name(name: str) -> bool:
+    return bool(HASHED_NAME_RE.search(name))
+
+
+def use_static_tags(soup):
+    """
+    Replaces the static urls of the link and script tags
+    of a BeautifulSoup document with {% static %} tags
+    """
+
+    static_url = settings.STATIC_URL
+    for tag, attr in (('link', 'href'), ('script', 'src')):
+        for element in soup.find_all(tag, **{attr: True}):
+            url = element[attr]
+            if url.startswith(static_url):
+                element[attr] = f"{{% static '{url[len(static_url):]}' %}}"
+
@@ -0,0 +1,17 @@
+from django import template
+
+from ..views.cache import get_canonical_url
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def canonical_url(context):
+    """
+    {% canonical_url %} the url of the page with its paging params
+    (settings.MIQ_PAGE_CACHE_QUERY_PARAMS), without tracking params
+    """
+
+    if request := context.get('request'):
+        return get_canonical_url(request)
+    return ''
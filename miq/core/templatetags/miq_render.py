@@ -0,0 +1,21 @@
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag
+def cached_render(obj, template_name: str = None):
+    """
+    {% cached_render obj %} renders obj (its stored or cached html)
+    {% cached_render obj 'template.html' %} renders obj with a template,
+    as `object` and by its model name, through the fragment cache
+    """
+
+    if not obj:
+        return ''
+
+    if not template_name:
+        return obj.get_rendered_html()
+
+    return obj._render_cached(
+        template_name, lambda: {'object': obj, obj._meta.model_name: obj})
@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from miq.core.build import STATE_FILE, fingerprint_dir, read_state, render_base_template, sync_static_files
+
+INDEX = (
+    '<html><head><title>App</title><link href="/static/css/main.1a2b3c4d.css" rel="stylesheet"></head>'
+    '<body><div id="root"></div><script src="/static/js/main.1a2b3c4d.js"></script></body></html>')
+
+
+class TestBuild(SimpleTestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.src = os.path.join(self.dir, 'src')
+        self.root = os.path.join(self.dir, 'static')
+        os.makedirs(self.src)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def write(self, name, content):
+        path = os.path.join(self.src, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(content)
+
+    def test_fingerprint(self):
+        self.write('app.js', 'a')
+        fingerprint = fingerprint_dir(self.src)
+
+        self.write('node_modules/lib.js', 'ignored')
+        self.assertEqual(fingerprint_dir(self.src), fingerprint)
+
+        self.write('app.js', 'b')
+        self.assertNotEqual(fingerprint_dir(self.src), fingerprint)
+
+    def test_sync_static_files(self):
+        self.write('core.css', 'body {}')
+        self.write('js/app.js', 'a')
+
+        with override_settings(
+                STATICFILES_DIRS=[self.src], STATIC_ROOT=self.root,
+                STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder']):
+            copied, deleted, hashes = sync_static_files({}, workers=2)
+            self.assertEqual(sorted(copied), ['core.css', 'js/app.js'])
+
+            copied, deleted, hashes = sync_static_files(hashes, workers=2)
+            self.assertEqual(copied, [])
+
+            self.write('js/app.js', 'b')
+            os.remove(os.path.join(self.src, 'core.css'))
+            copied, deleted, hashes = sync_static_files(hashes, workers=2)
+
+        self.assertEqual((copied, deleted), (['js/app.js'], ['core.css']))
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'core.css')))
+        with open(os.path.join(self.root, 'js', 'app.js')) as file:
+            self.assertEqual(file.read(), 'b')
+
+    def test_render_base_template(self):
+        html = render_base_template(INDEX)
+
+        self.assertTrue(html.startswith('{% load static %}'))
+        self.assertIn('{% block head %}{% endblock head %}', html)
+        self.assertIn("{% static 'js/main.1a2b3c4d.js' %}", html)
+
+    def test_command_state(self):
+        build = os.path.join(self.dir, 'build')
+        self.write('app.js', 'a')
+        os.makedirs(build)
+        with open(os.path.join(build, 'index.html'), 'w') as file:
+            file.write(INDEX)
+
+        with override_settings(
+                CLIENT_DIR=self.src, BUILD_DIR=build,
+                STATICFILES_DIRS=[self.src], STATIC_ROOT=self.root,
+                STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder']), \
+                mock.patch('miq.core.management.commands.build.subprocess.run'), \
+                mock.patch('miq.core.management.commands.build.Site.objects.first', return_value=None), \
+                mock.patch('miq.core.management.commands.build.output_path', os.path.join(self.dir, 'base.html')):
+            call_command('build', clear=True, stdout=StringIO())
+
+            # Out of the client sources, with the hashes of the cleared collect
+            self.assertFalse(os.path.exists(os.path.join(self.src, STATE_FILE)))
+            self.assertEqual(list(read_state(os.path.join(build, STATE_FILE))['static']), ['app.js'])
+
+            stdout = StringIO()
+            call_command('build', stdout=stdout)
+            self.assertIn('Static files: 0 copied, 0 deleted', stdout.getvalue())
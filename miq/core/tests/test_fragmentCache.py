@@ -0,0 +1,63 @@
+import shutil
+import hashlib
+from unittest import mock
+
+from django.template import Context, Template
+from django.template.loader import get_template
+from django.test import TestCase, override_settings
+
+from miq.core.mixins import get_template_hash
+from miq.core.models import Image, Index, Section, SectionType
+from miq.tests.mixins import TestMixin
+from miq.tests.utils import get_temp_img
+
+TEST_MEDIA_DIR = 'test_media'
+
+
+@override_settings(
+    MEDIA_ROOT=TEST_MEDIA_DIR, MIQ_IMAGE_PIPELINE='miq.core.pipeline.QueuePipeline',
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestFragmentCache(TestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.site.save()
+        self.image = Image.objects.create(site=self.site, user=self.get_user(), src=get_temp_img())
+
+    def tearDown(self):
+        shutil.rmtree(TEST_MEDIA_DIR, ignore_errors=True)
+
+    def test_image_render(self):
+        html = self.image.render()
+
+        with mock.patch.object(Image, 'to_json') as to_json:
+            self.assertEqual(self.image.render(), html)
+        to_json.assert_not_called()
+
+        # A save changes updated, and the key
+        self.image.alt_text = 'Red shoes'
+        self.image.save()
+        self.assertIn('Red shoes', self.image.render())
+
+    def test_template_change(self):
+        template = get_template('core/components/img.html')
+        self.assertEqual(
+            get_template_hash('core/components/img.html'),
+            hashlib.md5(template.template.source.encode()).hexdigest())
+
+        html = self.image.render()
+
+        with mock.patch('miq.core.mixins.get_template_hash', return_value='deployed'):
+            with mock.patch.object(Image, 'to_json', wraps=self.image.to_json) as to_json:
+                self.assertEqual(self.image.render(), html)
+        to_json.assert_called_once()
+
+    def test_tag(self):
+        index = Index.objects.get(site=self.site)
+        section = Section.objects.create(
+            site=self.site, source=index.slug, type=SectionType.TXT, html='<p>Hello</p>')
+        tpl = Template(
+            "{% load miq_render %}{% cached_render img %}|{% cached_render section 'core/components/section-html.html' %}")
+
+        html = tpl.render(Context({'section': section, 'img': self.image}))
+        self.assertIn(self.image.src.url, html)
+        self.assertIn('<p>Hello</p>', html)
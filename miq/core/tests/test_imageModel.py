@@ -1,13 +1,20 @@
 import shutil
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
 from django.test import override_settings
 from django.test import TransactionTestCase
+from django.utils import timezone
 
-from miq.core.models import Image
+from miq.core.models import Image, ImageStatus
 
 from miq.tests.mixins import TestMixin
 from miq.tests.utils import get_temp_img
 
 TEST_MEDIA_DIR = 'test_media'
+SYNC_PIPELINE = 'miq.core.pipeline.SyncPipeline'
+QUEUE_PIPELINE = 'miq.core.pipeline.QueuePipeline'
 
 
 class Mixin(TestMixin):
@@ -19,7 +26,7 @@ class Mixin(TestMixin):
             pass
 
 
-@override_settings(MEDIA_ROOT=(TEST_MEDIA_DIR))
+@override_settings(MEDIA_ROOT=(TEST_MEDIA_DIR), MIQ_IMAGE_PIPELINE=SYNC_PIPELINE)
 class TestCoreImageModel(Mixin, TransactionTestCase):
     def setUp(self) -> None:
         super().setUp()
@@ -41,3 +48,114 @@ class TestCoreImageModel(Mixin, TransactionTestCase):
             src=get_temp_img()
         )
         self.assertEqual(img.src.name, f'{img}')
+
+    def test_derivatives(self):
+        img = Image.objects.create(
+            user=self.user, site=self.site, src=get_temp_img(size=600))
+        img.refresh_from_db()
+
+        self.assertEqual(img.status, ImageStatus.READY)
+        self.assertTrue(img.thumb)
+        self.assertTrue(img.src_mobile)
+        self.assertEqual(img.thumb_sq.width, img.thumb_sq.height)
+
+    def test_dimensions(self):
+        img = Image.objects.create(
+            user=self.user, site=self.site, src=get_temp_img(size=600))
+        img = Image.objects.get(pk=img.pk)
+
+        self.assertEqual((img.src_width, img.src_height), (600, 600))
+        self.assertEqual(img.src_bytes, img.src.size)
+        self.assertEqual((img.thumb_width, img.thumb_sq_width), (450, 450))
+        self.assertEqual(img.thumb_bytes, img.thumb.size)
+
+        # Serializing never reads the files
+        img = Image.objects.get(pk=img.pk)
+        with mock.patch('django.core.files.storage.FileSystemStorage.open', side_effect=AssertionError):
+            data = img.to_json()
+            self.assertEqual(img.size_mobile, img.size_thumb)
+        self.assertEqual(data['thumb_sq_height'], 450)
+
+    def test_backfill_dimensions(self):
+        img = Image.objects.create(
+            user=self.user, site=self.site, src=get_temp_img(size=600))
+        Image.objects.update(src_width=None, thumb_width=None, thumb_bytes=None)
+
+        call_command('backfill_image_dimensions', stdout=mock.Mock())
+        img.refresh_from_db()
+        self.assertEqual(img.src_width, 600)
+        self.assertEqual(img.thumb_width, 450)
+        self.assertEqual(img.thumb_bytes, img.thumb.size)
+
+
+@override_settings(MEDIA_ROOT=(TEST_MEDIA_DIR), MIQ_IMAGE_PIPELINE=QUEUE_PIPELINE)
+class TestCoreImagePipeline(Mixin, TransactionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.get_user()
+
+    def test_pending(self):
+        img = Image.objects.create(
+            user=self.user, site=self.site, src=get_temp_img())
+        img.refresh_from_db()
+
+        self.assertEqual(img.status, ImageStatus.PENDING)
+        self.assertFalse(img.thumb)
+        self.assertEqual(Image.objects.pending().count(), 1)
+
+        call_command('process_images', verbosity=0)
+        img.refresh_from_db()
+        self.assertEqual(img.status, ImageStatus.READY)
+        self.assertEqual(img.attempts, 1)
+        self.assertTrue(img.thumb_sq)
+
+    def test_failed_retry(self):
+        img = Image.objects.create(
+            user=self.user, site=self.site, src=get_temp_img())
+
+        with mock.patch.object(Image, 'generate_derivatives', side_effect=OSError('broken')):
+            call_command('process_images', verbosity=0)
+
+        img.refresh_from_db()
+        self.assertEqual(img.status, ImageStatus.FAILED)
+        self.assertEqual(img.error, 'broken')
+
+        # Failed images are only picked up on retry
+        call_command('process_images', verbosity=0)
+        self.assertEqual(Image.objects.failed().count(), 1)
+
+        call_command('process_images', retry=True, verbosity=0)
+        img.refresh_from_db()
+        self.assertEqual(img.status, ImageStatus.READY)
+        self.assertEqual(img.attempts, 2)
+
+    def test_stale_processing(self):
+        img = Image.objects.create(
+            user=self.user, site=self.site, src=get_temp_img())
+        self.assertTrue(Image.objects.claim(img.pk))
+
+        # Still running
+        call_command('process_images', verbosity=0)
+        img.refresh_from_db()
+        self.assertEqual(img.status, ImageStatus.PROCESSING)
+
+        # Worker died
+        Image.objects.filter(pk=img.pk).update(updated=timezone.now() - timedelta(seconds=700))
+        self.assertEqual(Image.objects.stale().count(), 1)
+
+        call_command('process_images', verbosity=0)
+        img.refresh_from_db()
+        self.assertEqual(img.status, ImageStatus.READY)
+        self.assertEqual(img.attempts, 2)
+
+    def test_stale_max_attempts(self):
+        img = Image.objects.create(
+            user=self.user, site=self.site, src=get_temp_img())
+        Image.objects.filter(pk=img.pk).update(
+            status=ImageStatus.PROCESSING, attempts=3,
+            updated=timezone.now() - timedelta(seconds=700))
+
+        call_command('process_images', timeout=600, verbosity=0)
+        img.refresh_from_db()
+        self.assertEqual(img.status, ImageStatus.FAILED)
+        self.assertEqual(img.attempts, 3)
@@ -0,0 +1,130 @@
+import shutil
+
+from django.core.cache import cache
+from django.contrib.sites.models import Site
+from django.urls import reverse_lazy
+from django.test import TransactionTestCase, override_settings
+
+from miq.core.models import Image, Section, SectionType, Thumbnail
+
+from miq.tests.mixins import TestMixin
+from miq.tests.utils import get_temp_img
+
+TEST_MEDIA_DIR = 'test_media'
+RENDITIONS = {
+    'card': {'width': 200, 'height': 100, 'crop': 'fill', 'quality': {'jpeg': 70, 'webp': 70}},
+}
+
+
+class Mixin(TestMixin):
+
+    def tearDown(self):
+        cache.clear()
+        try:
+            shutil.rmtree(TEST_MEDIA_DIR)
+        except Exception:
+            pass
+
+    def get_path(self, slug, spec):
+        return reverse_lazy('core:image-rendition', args=[slug, spec])
+
+
+@override_settings(
+    MEDIA_ROOT=TEST_MEDIA_DIR, MIQ_IMAGE_RENDITIONS=RENDITIONS,
+    MIQ_IMAGE_PIPELINE='miq.core.pipeline.QueuePipeline')
+class TestCoreImageRenditionView(Mixin, TransactionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.img = Image.objects.create(
+            user=self.get_user(), site=self.site, src=get_temp_img(size=400))
+
+    def test_generates_once(self):
+        path = self.get_path(self.img.slug, 'card')
+
+        r = self.client.get(path)
+        self.assertEqual(r.status_code, 302)
+
+        thumb = Thumbnail.objects.get(image=self.img, spec='card')
+        self.assertEqual((thumb.src.width, thumb.src.height), (200, 100))
+        self.assertEqual(r.url, thumb.src.url)
+
+        # Served from cache
+        with self.assertNumQueries(0):
+            r = self.client.get(path)
+        self.assertEqual(r.url, thumb.src.url)
+        self.assertEqual(Thumbnail.objects.count(), 1)
+
+    def test_cache_scope(self):
+        path = self.get_path(self.img.slug, 'card')
+        self.assertEqual(self.client.get(path).status_code, 302)
+
+        # Another site does not get the cached url
+        other = Site.objects.create(domain='other.test', name='other')
+        with self.settings(SITE_ID=other.id):
+            self.assertEqual(self.client.get(path).status_code, 404)
+
+        self.img.deactivate()
+        self.assertEqual(self.client.get(path).status_code, 404)
+
+    def test_spec_change(self):
+        thumb = self.img.get_rendition('card')
+
+        renditions = {'card': {**RENDITIONS['card'], 'width': 100}}
+        with self.settings(MIQ_IMAGE_RENDITIONS=renditions):
+            self.assertTrue(thumb.is_stale)
+            thumb = Image.objects.get(pk=self.img.pk).get_rendition('card')
+
+        self.assertEqual(thumb.src.width, 100)
+        self.assertEqual(Thumbnail.objects.count(), 1)
+
+    def test_negotiation(self):
+        path = self.get_path(self.img.slug, 'card')
+
+        r = self.client.get(path, HTTP_ACCEPT='image/avif,image/webp,*/*')
+        self.assertIn('Accept', r['Vary'])
+        thumb = Thumbnail.objects.get(image=self.img, spec='card', format='avif')
+        self.assertEqual(r.url, thumb.src.url)
+
+        r = self.client.get(path, HTTP_ACCEPT='image/webp,*/*')
+        self.assertEqual(Thumbnail.objects.get(spec='card', format='webp').src.url, r.url)
+
+        r = self.client.get(path, HTTP_ACCEPT='*/*')
+        self.assertTrue(Thumbnail.objects.get(spec='card', format='jpeg').src.name.endswith('.jpg'))
+
+        r = self.client.get(reverse_lazy('core:image-rendition-format', args=[self.img.slug, 'card', 'webp']))
+        self.assertEqual(r.status_code, 302)
+        self.assertEqual(Thumbnail.objects.filter(spec='card').count(), 3)
+
+    def test_sources(self):
+        sources = self.img.to_json()['sources']['thumb']
+        self.assertEqual([s['type'] for s in sources], ['image/avif', 'image/webp'])
+        self.assertEqual(sources[1]['srcset'], reverse_lazy(
+            'core:image-rendition-format', args=[self.img.slug, 'thumb', 'webp']))
+
+        # Stored renditions are linked directly once prefetched
+        thumb = self.img.get_rendition('thumb', 'webp')
+        img = Image.objects.prefetch_related('thumbnails').get(pk=self.img.pk)
+        with self.assertNumQueries(0):
+            html = img.render()
+        self.assertIn(f'srcset="{thumb.src.url}" type="image/webp"', html)
+
+    def test_not_found(self):
+        self.assertEqual(self.client.get(self.get_path(self.img.slug, 'unknown')).status_code, 404)
+        self.assertEqual(self.client.get(self.get_path('unknown', 'card')).status_code, 404)
+        self.assertEqual(self.client.get(reverse_lazy(
+            'core:image-rendition-format', args=[self.img.slug, 'card', 'gif'])).status_code, 404)
+
+    @override_settings(MIQ_IMAGE_PIPELINE='miq.core.pipeline.SyncPipeline', MIQ_IMAGE_SOURCE_FORMATS=('webp',))
+    def test_section_sources(self):
+        img = Image.objects.create(user=self.user, site=self.site, src=get_temp_img(size=400))
+        self.assertEqual(Thumbnail.objects.filter(image=img, format='webp').count(), 2)
+
+        section = Section.objects.create(site=self.site, type=SectionType.SQGRID)
+        section.images.add(img)
+        section.refresh_from_db()
+
+        # Sources link the storage, not the rendition view
+        html = section.get_rendered_html()
+        thumb = img.thumbnails.get(spec='thumb_sq', format='webp')
+        self.assertIn(f'srcset="{thumb.src.url}"', html)
+        self.assertNotIn('/rendition', html)
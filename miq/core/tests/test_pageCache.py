@@ -0,0 +1,106 @@
+from unittest import mock
+
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse_lazy
+
+from miq.core.models import Index, Section
+from miq.tests.mixins import TestMixin
+
+path = reverse_lazy('index')
+
+
+@override_settings(MIQ_PAGE_CACHE=True)
+class TestPageCache(TestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.site.save()
+
+    def test_cached(self):
+        r = self.client.get(path)
+        self.assertEqual(r.status_code, 200)
+        self.assertIsNotNone(r.context)
+        etag = r['ETag']
+        self.assertTrue(r['Last-Modified'])
+
+        # Served from the cache, without rendering
+        r = self.client.get(path)
+        self.assertEqual(r.status_code, 200)
+        self.assertIsNone(r.context)
+        self.assertEqual(r['ETag'], etag)
+
+        r = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 304)
+
+    def test_invalidation(self):
+        self.client.get(path)
+
+        index = Index.objects.get(site=self.site)
+        index.title = 'Hello'
+        index.save()
+
+        r = self.client.get(path)
+        self.assertEqual(r.context.get('title'), 'Hello')
+        self.assertIsNone(self.client.get(path).context)
+
+        Section.objects.create(site=self.site, source=index.slug, text='New')
+        self.assertIsNotNone(self.client.get(path).context)
+
+        self.set_live()
+        r = self.client.get(path)
+        self.assertTrue(r.context.get('is_live'))
+
+    def test_invalidated_after_materialize(self):
+        index = Index.objects.get(site=self.site)
+        section = Section.objects.create(site=self.site, source=index.slug, html='<p>Old</p>')
+        set_rendered_html = Section.set_rendered_html
+
+        def render(section):
+            # A request between the save signal and the stored html
+            self.client.get(path)
+            return set_rendered_html(section)
+
+        section.html = '<p>New</p>'
+        with mock.patch.object(Section, 'set_rendered_html', render):
+            section.save()
+
+        self.assertIsNotNone(self.client.get(path).context)
+
+    def test_query_params(self):
+        self.assertIsNotNone(self.client.get(path, {'utm_source': 'a'}).context)
+
+        # Tracking params share the entry of the page
+        self.assertIsNone(self.client.get(path, {'utm_source': 'b'}).context)
+        self.assertIsNone(self.client.get(path, {'fbclid': 'x', 'utm_medium': 'c'}).context)
+        self.assertIsNone(self.client.get(path).context)
+
+        # Params of the page have their own entry
+        self.assertIsNotNone(self.client.get(path, {'page': '1', 'utm_source': 'a'}).context)
+        self.assertIsNone(self.client.get(path, {'page': '1'}).context)
+
+        # Unknown params bypass the cache
+        self.assertIsNotNone(self.client.get(path, {'x': 'random'}).context)
+        self.assertIsNotNone(self.client.get(path, {'x': 'random'}).context)
+
+    def test_canonical_url(self):
+        template = Template('{% load miq_page %}{% canonical_url %}')
+
+        request = RequestFactory().get('/blog/', {'page': '2', 'utm_source': 'a'})
+        self.assertEqual(template.render(Context({'request': request})), 'http://testserver/blog/?page=2')
+
+        request = RequestFactory().get('/blog/', {'utm_source': 'a', 'x': 'random'})
+        self.assertEqual(template.render(Context({'request': request})), 'http://testserver/blog/')
+
+    def test_authenticated(self):
+        user = self.get_user()
+        self.client.force_login(user)
+
+        self.client.get(path)
+        r = self.client.get(path)
+        self.assertIsNotNone(r.context)
+        self.assertFalse(r.has_header('ETag'))
+
+    @override_settings(MIQ_PAGE_CACHE=False)
+    def test_disabled(self):
+        self.client.get(path)
+        self.assertIsNotNone(self.client.get(path).context)
@@ -0,0 +1,41 @@
+from django.test import TestCase
+from django.contrib.auth.models import Group
+
+from miq.core.cache import get_user_perms
+from miq.core.utils import get_serialized_app_configs_dict
+
+from miq.tests.mixins import TestMixin
+
+
+class TestPermsCache(TestMixin, TestCase):
+    def test_user_perms(self):
+        user = self.get_user()
+        self.assertEqual(get_user_perms(user), [])
+
+        # A fresh user object, without the backend cache
+        user = self.refresh_user(user.username)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_perms(user), [])
+
+        user = self.add_user_perm(user, 'view_image')
+        self.assertEqual(get_user_perms(user), ['core.view_image'])
+
+        group = Group.objects.create(name='editors')
+        user.groups.add(group)
+        group.permissions.add(self.get_user_perm('change_image'))
+
+        user = self.refresh_user(user.username)
+        self.assertEqual(get_user_perms(user), ['core.change_image', 'core.view_image'])
+
+    def test_app_configs(self):
+        get_serialized_app_configs_dict()
+
+        with self.assertNumQueries(0):
+            apps = get_serialized_app_configs_dict(exclude=['rest_framework'], exclude_django_apps=True)
+
+        self.assertIn('core', apps)
+        self.assertNotIn('auth', apps)
+        self.assertNotIn('rest_framework', apps)
+
+        apps['core']['models'].append('other')
+        self.assertNotIn('other', get_serialized_app_configs_dict()['core']['models'])
@@ -0,0 +1,55 @@
+from django.test import TestCase, override_settings, modify_settings
+from django.urls import reverse_lazy
+from django.contrib.sites.models import Site
+
+from miq.core.queries import QueryRecorder
+from miq.tests.mixins import TestMixin
+
+path = reverse_lazy('index')
+
+
+class TestQueryRecorder(TestMixin, TestCase):
+    def test_duplicates(self):
+        with QueryRecorder() as recorder:
+            for pk in range(3):
+                Site.objects.filter(pk=pk).first()
+            Site.objects.count()
+
+        self.assertEqual(recorder.count, 4)
+        self.assertEqual(list(recorder.duplicates.values()), [3])
+        self.assertIn('3x SELECT', recorder.get_report())
+
+    def test_budget(self):
+        with self.assertMaxQueries(1):
+            Site.objects.count()
+
+        with self.assertRaises(AssertionError):
+            with self.assertMaxQueries(1):
+                Site.objects.count()
+                Site.objects.count()
+
+        with self.assertRaises(AssertionError):
+            with self.assertMaxQueries(5, duplicates=False):
+                Site.objects.count()
+                Site.objects.count()
+
+        self.assertEqual(self.assertQueryBudget(1, Site.objects.count), 1)
+
+
+@modify_settings(MIDDLEWARE={'append': 'miq.core.middleware.QueryCountMiddleware'})
+class TestQueryCountMiddleware(TestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.site.save()
+
+    @override_settings(MIQ_QUERY_COUNT=True)
+    def test_headers(self):
+        r = self.client.get(path)
+        self.assertGreater(int(r['X-Query-Count']), 0)
+        self.assertGreaterEqual(float(r['X-Query-Time']), 0)
+        self.assertIn('X-Query-Duplicates', r)
+
+    @override_settings(MIQ_QUERY_COUNT=False)
+    def test_disabled(self):
+        r = self.client.get(path)
+        self.assertNotIn('X-Query-Count', r)
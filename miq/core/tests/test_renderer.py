@@ -0,0 +1,32 @@
+from unittest import mock
+
+from django.template import Template
+from django.test import SimpleTestCase
+
+from miq.core.mixins import CompiledTemplateCache, RendererMixin, inline_templates
+
+
+class TestCompiledTemplateCache(SimpleTestCase):
+    def test_lru(self):
+        templates = CompiledTemplateCache(max_size=2)
+        first = templates.get('<p>{{ a }}</p>')
+
+        self.assertIs(templates.get('<p>{{ a }}</p>'), first)
+
+        templates.get('<p>{{ b }}</p>')
+        templates.get('<p>{{ a }}</p>')
+        templates.get('<p>{{ c }}</p>')
+
+        # b was the least recently used
+        self.assertEqual(len(templates.templates), 2)
+        self.assertIs(templates.get('<p>{{ a }}</p>'), first)
+
+    def test_render(self):
+        inline_templates.clear()
+        renderer = RendererMixin()
+
+        with mock.patch('miq.core.mixins.Template', wraps=Template) as template:
+            self.assertEqual(renderer._render('<b>{{ v }}</b>', {'v': 1}), '<b>1</b>')
+            self.assertEqual(renderer._render('<b>{{ v }}</b>', {'v': 2}), '<b>2</b>')
+
+        self.assertEqual(template.call_count, 1)
@@ -0,0 +1,72 @@
+import shutil
+
+from django.test import TestCase, override_settings
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test.utils import CaptureQueriesContext
+
+from miq.core.models import Image, Index, Section, SectionType
+from miq.core.models.section import RENDERER_VERSION
+from miq.tests.mixins import TestMixin
+from miq.tests.utils import get_temp_img
+
+TEST_MEDIA_DIR = 'test_media'
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_DIR, MIQ_IMAGE_PIPELINE='miq.core.pipeline.QueuePipeline')
+class TestSectionQueries(TestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.site.save()
+        self.index = Index.objects.get(site=self.site)
+        user = self.get_user()
+        self.images = [
+            Image.objects.create(site=self.site, user=user, src=get_temp_img(), position=position)
+            for position in (3, 1, 2)
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(TEST_MEDIA_DIR, ignore_errors=True)
+
+    def create_sections(self, count):
+        for i in range(count):
+            section = Section.objects.create(
+                site=self.site, source=self.index.slug, type=SectionType.IMG, position=i)
+            section.images.add(*self.images)
+
+    def render_sections(self) -> int:
+        with CaptureQueriesContext(connection) as ctx:
+            for section in Section.objects.filter(source=self.index.slug).order_by('position').for_render():
+                render_to_string('core/components/section.django.html', {'section': section})
+        return len(ctx.captured_queries)
+
+    def test_ordered_images(self):
+        self.create_sections(1)
+        section = Section.objects.with_images().get(source=self.index.slug)
+
+        with self.assertNumQueries(0):
+            self.assertEqual([img.position for img in section.ordered_images], [1, 2, 3])
+            self.assertEqual(section.image.position, 1)
+
+        # Without prefetch
+        section = Section.objects.filter(pk=section.pk).prefetch_related(None).get()
+        self.assertEqual(section.image.position, 1)
+
+    def test_constant_queries(self):
+        self.create_sections(5)
+
+        # Stored html from older templates, rendered live
+        with self.settings(MIQ_SECTION_RENDERER_VERSION=RENDERER_VERSION + 1):
+            few = self.render_sections()
+
+            self.create_sections(45)
+            self.assertEqual(self.render_sections(), few)
+        # outdated check, sections, images, renditions
+        self.assertLessEqual(few, 4)
+
+    def test_stored_html(self):
+        self.create_sections(5)
+        self.assertIn('<img', Section.objects.first().get_rendered_html())
+
+        # outdated check, sections, no image
+        self.assertEqual(self.render_sections(), 2)
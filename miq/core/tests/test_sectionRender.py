@@ -0,0 +1,58 @@
+import shutil
+
+from django.core.management import call_command
+from django.template.loader import render_to_string
+from django.test import TestCase, override_settings
+
+from miq.core.models import Image, Index, Section, SectionType
+from miq.tests.mixins import TestMixin
+from miq.tests.utils import get_temp_img
+
+TEST_MEDIA_DIR = 'test_media'
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_DIR, MIQ_IMAGE_PIPELINE='miq.core.pipeline.QueuePipeline')
+class TestSectionRender(TestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.site.save()
+        self.index = Index.objects.get(site=self.site)
+        self.image = Image.objects.create(site=self.site, user=self.get_user(), src=get_temp_img())
+
+    def tearDown(self):
+        shutil.rmtree(TEST_MEDIA_DIR, ignore_errors=True)
+
+    def create_section(self, type, **kwargs):
+        return Section.objects.create(site=self.site, source=self.index.slug, type=type, **kwargs)
+
+    def test_rendered_on_save(self):
+        section = self.create_section(SectionType.TXT, html='<p>Hello</p>')
+        section.refresh_from_db()
+        self.assertEqual(section.rendered_html.strip(), '<p>Hello</p>')
+
+        section.html = '<p>Bye</p>'
+        section.save()
+        section.refresh_from_db()
+        self.assertEqual(section.rendered_html.strip(), '<p>Bye</p>')
+
+    def test_image_types(self):
+        for type in (SectionType.IMG, SectionType.HGAL, SectionType.SQGRID, SectionType.SLIDER):
+            section = self.create_section(type)
+            section.images.add(self.image)
+
+            section = Section.objects.get(pk=section.pk)
+            self.assertIn(self.image.src.url, section.rendered_html, type)
+
+            with self.assertNumQueries(0):
+                html = render_to_string('core/components/section.django.html', {'section': section})
+            self.assertIn(self.image.src.url, html)
+
+    def test_render_sections(self):
+        section = self.create_section(SectionType.TXT, html='<p>Hello</p>')
+        Section.objects.update(rendered_html='', renderer_version=0)
+
+        with override_settings(MIQ_SECTION_RENDERER_VERSION=2):
+            call_command('render_sections', stdout=None)
+            section.refresh_from_db()
+            self.assertEqual(section.renderer_version, 2)
+            self.assertEqual(section.rendered_html.strip(), '<p>Hello</p>')
@@ -0,0 +1,45 @@
+from django.test import TestCase
+from django.urls import reverse_lazy
+
+from miq.core.models import SiteSetting
+from miq.core.cache import get_site_settings_snapshot
+
+from miq.tests.mixins import TestMixin
+
+path = reverse_lazy('index')
+
+
+class TestSiteSettingCache(TestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.site.save()
+
+    def test_snapshot(self):
+        site = self.site
+        snapshot = get_site_settings_snapshot(site)
+        self.assertFalse(snapshot['context']['is_live'])
+
+        with self.assertNumQueries(0):
+            self.assertIs(get_site_settings_snapshot(site), snapshot)
+
+        setting = SiteSetting.objects.get(site=site)
+        setting.contact_number = '+22500000000'
+        setting.save()
+
+        snapshot = get_site_settings_snapshot(site)
+        self.assertEqual(snapshot['context']['contact_number'], '+22500000000')
+        self.assertEqual(snapshot['shared_data']['contact_number_display'], '+22500000000')
+
+    def test_context(self):
+        self.client.get(path)
+        self.set_live()
+
+        r = self.client.get(path)
+        self.assertTrue(r.context['is_live'])
+        self.assertEqual(r.context['sharedData']['site']['name'], self.site.name)
+
+        site = self.site
+        site.name = 'Shop'
+        site.save()
+        r = self.client.get(path)
+        self.assertEqual(r.context['sharedData']['site']['name'], 'Shop')
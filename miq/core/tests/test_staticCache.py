@@ -0,0 +1,54 @@
+from bs4 import BeautifulSoup
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+from django.template.loader import get_template
+
+from miq.core.checks import check_static_storage
+from miq.core.middleware import StaticCacheMiddleware
+from miq.core.storage import is_hashed_name, use_static_tags
+
+
+class TestStaticCache(SimpleTestCase):
+    def get_response(self, path):
+        middleware = StaticCacheMiddleware(lambda request: HttpResponse())
+        return middleware(RequestFactory().get(path))
+
+    def test_hashed_name(self):
+        self.assertTrue(is_hashed_name('core.3f2a9c1e5b7d.css'))
+        self.assertTrue(is_hashed_name('js/main.1a2b3c4d.chunk.js'))
+        self.assertFalse(is_hashed_name('core.css'))
+
+    def test_middleware(self):
+        response = self.get_response('/static/core.3f2a9c1e5b7d.css')
+        self.assertIn('immutable', response['Cache-Control'])
+
+        self.assertFalse(self.get_response('/static/core.css').has_header('Cache-Control'))
+        self.assertFalse(self.get_response('/about.3f2a9c1e5b7d.css').has_header('Cache-Control'))
+
+    def test_build_static_tags(self):
+        soup = BeautifulSoup(
+            '<head><link href="/static/css/main.1a2b3c4d.css" rel="stylesheet">'
+            '<link href="https://fonts.test/a.css" rel="stylesheet"></head>'
+            '<body><script src="/static/js/main.1a2b3c4d.js"></script></body>', 'html.parser')
+        use_static_tags(soup)
+
+        html = str(soup)
+        self.assertIn("{% static 'css/main.1a2b3c4d.css' %}", html)
+        self.assertIn("{% static 'js/main.1a2b3c4d.js' %}", html)
+        self.assertIn('https://fonts.test/a.css', html)
+
+    def test_public_template(self):
+        source = get_template('core/public.django.html').template.source
+        self.assertNotIn('{% now', source)
+
+    def test_storage_check(self):
+        default = {'BACKEND': 'django.core.files.storage.FileSystemStorage'}
+        static = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+
+        with self.settings(STORAGES={'default': default, 'staticfiles': {'BACKEND': static}}):
+            self.assertEqual([e.id for e in check_static_storage(None)], ['miq.W001'])
+
+        with self.settings(STORAGES={
+                'default': default, 'staticfiles': {'BACKEND': 'miq.core.storage.ManifestStaticStorage'}}):
+            self.assertEqual(check_static_storage(None), [])
@@ -0,0 +1,118 @@
+import time
+import threading
+from io import BytesIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase, override_settings
+from PIL import Image as PImage
+
+from miq.core.utils import download_img_file, img_files_from_urls
+from miq.core.utils_http import DownloadError, download_file, download_many
+
+
+def get_png():
+    blob = BytesIO()
+    PImage.new('RGB', (40, 30), (120, 40, 200)).save(blob, 'png')
+    return blob.getvalue()
+
+
+PNG = get_png()
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split('?')[0]
+
+        if path in ('/img.png', '/img'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/png')
+            self.send_header('Content-Length', str(len(PNG)))
+            self.end_headers()
+            self.wfile.write(PNG)
+        elif path == '/big':
+            # No Content-Length, only the streamed size can be checked
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.end_headers()
+            for _ in range(8):
+                self.wfile.write(b'0' * 1024)
+        elif path == '/slow':
+            time.sleep(1)
+            self.send_response(200)
+            self.end_headers()
+        else:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDownload(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def test_download_file(self):
+        file = download_file(f'{self.base_url}/img.png')
+
+        self.assertTrue(file.name.endswith('.png'))
+        self.assertEqual(file.size, len(PNG))
+        self.assertEqual(file.read(), PNG)
+
+        # Extension from the Content-Type
+        file = download_file(f'{self.base_url}/img')
+        self.assertTrue(file.name.endswith('.png'))
+
+    def test_errors(self):
+        with self.assertRaises(DownloadError):
+            download_file(f'{self.base_url}/missing.png')
+
+        with self.assertRaises(DownloadError):
+            download_file(f'{self.base_url}/img.png', max_bytes=10)
+
+        with self.assertRaises(DownloadError):
+            download_file(f'{self.base_url}/big', max_bytes=4 * 1024)
+
+        with self.assertRaises(DownloadError):
+            download_file(f'{self.base_url}/slow', timeout=(1, .2))
+
+    @override_settings(MIQ_HTTP_MAX_BYTES=4 * 1024)
+    def test_max_bytes_setting(self):
+        with self.assertRaises(DownloadError):
+            download_file(f'{self.base_url}/big')
+
+    def test_download_many(self):
+        urls = [f'{self.base_url}/img.png', f'{self.base_url}/missing.png', f'{self.base_url}/img']
+        files = download_many(urls, max_workers=3)
+
+        self.assertEqual(len(files), 3)
+        self.assertEqual(files[0].read(), PNG)
+        self.assertIsNone(files[1])
+        self.assertEqual(files[2].read(), PNG)
+
+        self.assertEqual(download_many([]), [])
+
+    def test_img_files_from_urls(self):
+        files = img_files_from_urls([f'//127.0.0.1:{self.server.server_address[1]}/img.png?v=1'])
+        self.assertEqual(files[0].read(), PNG)
+
+    @override_settings(MIQ_HTTP_MAX_BYTES=4 * 1024)
+    def test_download_img_file(self):
+        file = download_img_file(f'//127.0.0.1:{self.server.server_address[1]}/img.png')
+        self.assertEqual(file.read(), PNG)
+
+        self.assertIsNone(download_img_file(f'{self.base_url}/big'))
+        self.assertIsNone(download_img_file(f'{self.base_url}/missing.png'))
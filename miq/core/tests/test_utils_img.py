@@ -0,0 +1,54 @@
+from io import BytesIO
+
+from django.test import SimpleTestCase
+from PIL import Image as PImage
+
+from miq.core.utils_img import make_derivatives, RenditionSpec, THUMB_SIZE
+
+
+def get_jpeg(width, height):
+    blob = BytesIO()
+    PImage.new('RGB', (width, height), (120, 40, 200)).save(blob, 'jpeg')
+    blob.seek(0)
+    return blob
+
+
+class TestMakeDerivatives(SimpleTestCase):
+    def test_sizes(self):
+        derivatives = make_derivatives(get_jpeg(2000, 1000))
+
+        self.assertEqual(set(derivatives.keys()), {'src_mobile', 'thumb', 'thumb_sq'})
+        self.assertEqual(derivatives['thumb'].width, THUMB_SIZE[0])
+        self.assertEqual(derivatives['thumb'].height, THUMB_SIZE[1] // 2)
+        self.assertEqual(derivatives['thumb_sq'].width, derivatives['thumb_sq'].height)
+
+        # Same spec, same buffer
+        self.assertIs(derivatives['src_mobile'].file, derivatives['thumb'].file)
+
+        thumb = PImage.open(derivatives['thumb'].file)
+        self.assertEqual(thumb.size, (derivatives['thumb'].width, derivatives['thumb'].height))
+
+    def test_small_image(self):
+        derivatives = make_derivatives(get_jpeg(300, 200))
+
+        self.assertEqual(derivatives['thumb'].width, 300)
+        self.assertEqual(derivatives['thumb_sq'].width, 200)
+        self.assertEqual(derivatives['thumb_sq'].height, 200)
+
+    def test_formats(self):
+        derivatives = make_derivatives(get_jpeg(600, 600))
+        self.assertEqual(derivatives['thumb'].format, 'jpeg')
+
+        blob = BytesIO()
+        PImage.new('RGBA', (600, 600)).save(blob, 'png')
+        blob.seek(0)
+
+        # Transparency is kept
+        derivatives = make_derivatives(blob)
+        self.assertEqual(derivatives['thumb'].format, 'png')
+
+        webp = make_derivatives(get_jpeg(600, 600), {'thumb': RenditionSpec(100, 100, format='webp')})
+        self.assertEqual(PImage.open(webp['thumb'].file).format, 'WEBP')
+
+    def test_no_file(self):
+        self.assertEqual(make_derivatives(None), {})
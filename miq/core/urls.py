@@ -25,5 +25,11 @@ urlpatterns = [
     # path(f'{settings.API_PATH}/', include(auth_router.urls)),
 
     path('about/', views.AboutPage.as_view(), name='about'),
+    path(
+        'images/<slug:slug>/<slug:spec>/',
+        views.ImageRenditionView.as_view(), name='image-rendition'),
+    path(
+        'images/<slug:slug>/<slug:spec>/<slug:format>/',
+        views.ImageRenditionView.as_view(), name='image-rendition-format'),
     path('<slug:slug>/', views.PageView.as_view(), name='page'),
 ]
@@ -1,17 +1,19 @@
 from collections import namedtuple
+from functools import lru_cache
 import os
-import requests
 import logging
 from io import BytesIO
 
 from django.apps import apps
-from django.utils import timezone
 from django.core.files import File
 # from django.urls.base import reverse_lazy
 from django.utils.text import Truncator
 from django.contrib.auth import get_user_model
 from django.core.validators import validate_ipv46_address
 
+from .utils_img import encode_img
+from .utils_http import DownloadError, download_file, download_many
+
 logger = logging.getLogger(__name__)
 loginfo = logger.info
 logerror = logger.error
@@ -52,28 +54,30 @@ def clean_img_url(url: str) -> str:
     return url
 
 
-def download_img_from_url(url, request=requests):
-    url = clean_img_url(url)
-
-    res = request.get(url)
-    if res.status_code != 200:
-        return None
+def download_img_file(url):
+    """
+    Streams a remote image to a temporary file, None if it failed
+    """
 
-    return res
+    url = clean_img_url(url)
+    try:
+        return download_file(url)
+    except DownloadError as e:
+        logerror(str(e))
 
 
-def img_file_from_response(response, filename=None, ext='.jpg'):
-    filename = filename or f'{timezone.now().timestamp()}{ext}'
-    return File(BytesIO(response.content), name=filename)
+def img_files_from_urls(urls, max_workers=4):
+    """
+    Downloads images concurrently.
+    Returns a list of files, None for urls that failed, in the order of urls
+    """
 
+    return download_many([clean_img_url(url) for url in urls], max_workers=max_workers)
 
-def img_file_from_pil(pil_image, ext='png'):
-    if not ext or ext.lower() not in ['webp', 'jpeg', 'png']:
-        ext = 'png'
 
-    blob = BytesIO()
-    pil_image.save(blob, ext.upper())
-    return File(blob)
+def img_file_from_pil(pil_image, ext='png', quality=None):
+    content, ext = encode_img(pil_image, ext, quality)
+    return File(BytesIO(content))
 
 
 def get_file_ext(path):
@@ -102,20 +106,26 @@ def serialize_app_config(app_config):
     }
 
 
+DJANGO_APPS = (
+    'admin', 'auth', 'contenttypes', 'messages',
+    'sessions', 'sitemaps', 'sites', 'staticfiles'
+)
+
+
+@lru_cache
+def get_serialized_app_configs() -> tuple:
+    # The app registry does not change once loaded
+    return tuple(serialize_app_config(app) for app in apps.get_app_configs())
+
+
 def get_serialized_app_configs_dict(exclude=None, exclude_django_apps=False):
-    exclude = exclude if isinstance(exclude, list) else []
+    exclude = list(exclude) if isinstance(exclude, (list, tuple)) else []
     if exclude_django_apps:
-        exclude.extend([
-            'admin', 'auth', 'contenttypes', 'messages',
-            'sessions', 'sitemaps', 'sites', 'staticfiles'
-        ])
-
-    installed_apps = [
-        serialize_app_config(app)
-        for app in apps.get_app_configs()
-    ]
+        exclude.extend(DJANGO_APPS)
+
     return {
-        f"{app['label']}": app for app in installed_apps
+        f"{app['label']}": {**app, 'models': list(app['models'])}
+        for app in get_serialized_app_configs()
         if f"{app['label']}" not in exclude
     }
 
@@ -139,7 +149,9 @@ def create_staffuser(username, password, **kwargs):
 
 
 def get_user_perms_list(user):
-    return list(user.get_all_permissions())
+    from .cache import get_user_perms
+
+    return list(get_user_perms(user))
 
 
 def get_user_perms_dict(user):
@@ -0,0 +1,153 @@
+"""
+HTTP DOWNLOADS
+
+Remote files (image imports) are fetched through one pooled session,
+with connect/read timeouts and a byte cap, and streamed to a spooled
+temporary file instead of being held in memory.
+
+settings.MIQ_HTTP_TIMEOUT: (connect, read) seconds, default (3.05, 15)
+settings.MIQ_HTTP_MAX_BYTES: largest accepted body, default 20MB
+settings.MIQ_HTTP_POOL_SIZE: connections kept per host, default 10
+"""
+
+import os
+import logging
+import mimetypes
+import tempfile
+import threading
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from django.conf import settings
+from django.utils import timezone
+from django.core.files import File
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+# Bodies larger than this are rolled over to disk
+SPOOL_SIZE = 1024 * 1024
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class DownloadError(Exception):
+    pass
+
+
+def get_http_timeout():
+    return getattr(settings, 'MIQ_HTTP_TIMEOUT', (3.05, 15))
+
+
+def get_http_max_bytes() -> int:
+    return getattr(settings, 'MIQ_HTTP_MAX_BYTES', 20 * 1024 * 1024)
+
+
+def get_http_pool_size() -> int:
+    return getattr(settings, 'MIQ_HTTP_POOL_SIZE', 10)
+
+
+def get_http_session() -> requests.Session:
+    """
+    Process wide session, connections are reused across downloads
+    """
+
+    global _session
+    with _session_lock:
+        if _session is None:
+            size = get_http_pool_size()
+            adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+    return _session
+
+
+def get_download_filename(url: str, content_type: str = None) -> str:
+    ext = os.path.splitext(urlsplit(url).path)[1]
+    if not ext and content_type:
+        ext = mimetypes.guess_extension(content_type.split(';')[0].strip()) or ''
+    return f'{timezone.now().timestamp()}{ext}'
+
+
+def stream_to_file(response, *, max_bytes: int = None, name: str = None) -> File:
+    """
+    Writes the body of a streamed response to a spooled temporary file.
+    Raises DownloadError when the body is larger than max_bytes.
+    """
+
+    max_bytes = max_bytes or get_http_max_bytes()
+    length = response.headers.get('Content-Length', '')
+    if length.isdigit() and int(length) > max_bytes:
+        response.close()
+        raise DownloadError(f'Body too large: {length} bytes')
+
+    tmp = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    size = 0
+    try:
+        for chunk in response.iter_content(CHUNK_SIZE):
+            size += len(chunk)
+            # Content-Length can be missing or wrong
+            if size > max_bytes:
+                raise DownloadError(f'Body larger than {max_bytes} bytes')
+            tmp.write(chunk)
+    except BaseException:
+        tmp.close()
+        raise
+    finally:
+        response.close()
+
+    tmp.seek(0)
+    file = File(tmp, name=name)
+    file.size = size
+    return file
+
+
+def download_file(url: str, *, session=None, timeout=None, max_bytes: int = None, name: str = None) -> File:
+    """
+    Downloads url to a temporary file.
+    Raises DownloadError on connection errors, timeouts, non 200 responses
+    and bodies larger than max_bytes.
+    """
+
+    session = session or get_http_session()
+    try:
+        response = session.get(url, stream=True, timeout=timeout or get_http_timeout())
+    except requests.RequestException as e:
+        raise DownloadError(f'Cannot download [{url}]: {e}') from e
+
+    if response.status_code != 200:
+        response.close()
+        raise DownloadError(f'Cannot download [{url}]: HTTP {response.status_code}')
+
+    name = name or get_download_filename(url, response.headers.get('Content-Type'))
+    try:
+        return stream_to_file(response, max_bytes=max_bytes, name=name)
+    except requests.RequestException as e:
+        raise DownloadError(f'Cannot download [{url}]: {e}') from e
+
+
+def download_many(urls, *, max_workers: int = None, **kwargs) -> list:
+    """
+    Downloads urls concurrently.
+    Returns a list of files, None for urls that failed, in the order of urls
+    """
+
+    urls = list(urls)
+    if not urls:
+        return []
+
+    def fetch(url):
+        try:
+            return download_file(url, **kwargs)
+        except DownloadError as e:
+            logger.error(str(e))
+
+    max_workers = min(max_workers or get_http_pool_size(), len(urls))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='miq-http') as executor:
+        return list(executor.map(fetch, urls))
@@ -1,8 +1,35 @@
-from PIL import Image as PImage
+from io import BytesIO
+from collections import namedtuple
+
+from PIL import Image as PImage, ImageOps
+from django.core.files.base import ContentFile
 
 IMG_SIZE = (800, 1200)
 THUMB_SIZE = (450, 450)
 
+# Crop modes
+FIT = 'fit'  # shrink to fit in the box, only if both sides are larger
+SQUARE = 'square'  # fit then center crop to a square
+FILL = 'fill'  # resize and center crop to the exact box
+
+# quality: int, or ((format, int), ...), defaults to QUALITY
+RenditionSpec = namedtuple(
+    'RenditionSpec', ['width', 'height', 'crop', 'format', 'quality'],
+    defaults=[FIT, 'jpeg', None])
+
+QUALITY = {'jpeg': 85, 'webp': 80, 'avif': 60}
+
+THUMB_SPEC = RenditionSpec(*THUMB_SIZE)
+THUMB_SQ_SPEC = RenditionSpec(*THUMB_SIZE, crop=SQUARE)
+
+DERIVATIVES = {
+    'src_mobile': THUMB_SPEC,
+    'thumb': THUMB_SPEC,
+    'thumb_sq': THUMB_SQ_SPEC,
+}
+
+Derivative = namedtuple('Derivative', ['file', 'width', 'height', 'format'])
+
 
 def get_thumbnail(file, width=THUMB_SIZE[0], height=THUMB_SIZE[1]):
 
@@ -13,7 +40,7 @@ def get_thumbnail(file, width=THUMB_SIZE[0], height=THUMB_SIZE[1]):
     thumb = PImage.open(file)
     th_width, th_height = thumb.size
     if th_width > width and th_height > height:
-        thumb.thumbnail((width, height), PImage.ANTIALIAS)
+        thumb.thumbnail((width, height), PImage.LANCZOS)
         # logger.info(f'Resized file[{file}]')
 
     # if save:
@@ -34,7 +61,7 @@ def crop_img_to_square(file):
     width, height = img.size
     if width > IMG_SIZE[0] and height > IMG_SIZE[1]:
         # keep ratio but shrink down
-        img.thumbnail((width, height), PImage.ANTIALIAS)
+        img.thumbnail((width, height), PImage.LANCZOS)
         # img.show()
 
     # check which one is smaller
@@ -59,3 +86,138 @@ def crop_img_to_square(file):
         cropped = img
 
     return cropped
+
+
+"""
+SINGLE DECODE ENGINE
+"""
+
+
+def open_img(file, size=None):
+    """
+    Decodes an image file once.
+    JPEGs are downscaled while decoding, never below the given size.
+    """
+
+    img = PImage.open(file)
+    if size and img.format == 'JPEG':
+        img.draft(img.mode, size)
+    img.load()
+    return img
+
+
+def fit_img(img, width, height):
+    """
+    Shrinks a copy of img to fit in width x height,
+    only if both of its sides are larger.
+    """
+
+    img = img.copy()
+    if img.width > width and img.height > height:
+        img.thumbnail((width, height), PImage.LANCZOS)
+    return img
+
+
+def square_img(img):
+    width, height = img.size
+    if width == height:
+        return img
+
+    side = min(width, height)
+    left = (width - side) // 2
+    top = (height - side) // 2
+    return img.crop((left, top, left + side, top + side))
+
+
+def fill_img(img, width, height):
+    return ImageOps.fit(img, (width, height), PImage.LANCZOS)
+
+
+def supports_format(ext) -> bool:
+    """
+    Whether Pillow can write the given format, AVIF needs Pillow>=11.3 or a plugin.
+    """
+
+    PImage.init()
+    return f'{ext}'.upper() in PImage.SAVE
+
+
+def get_quality(spec, ext):
+    quality = spec.quality
+    if isinstance(quality, (dict, tuple)):
+        quality = dict(quality).get(ext)
+    return quality or QUALITY.get(ext)
+
+
+def get_ext_filename(root, ext):
+    return f"{root}.{'jpg' if ext == 'jpeg' else ext}"
+
+
+def encode_img(img, ext='png', quality=None):
+    """
+    Returns (bytes, format).
+    Images with transparency are stored as PNG instead of JPEG.
+    """
+
+    ext = f'{ext}'.lower()
+    if ext not in ['webp', 'jpeg', 'png', 'avif'] or not supports_format(ext):
+        ext = 'png'
+
+    if ext == 'jpeg':
+        if img.mode in ('RGBA', 'LA') or 'transparency' in img.info:
+            ext = 'png'
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+
+    options = {}
+    if quality and ext != 'png':
+        options['quality'] = quality
+    if ext == 'png':
+        options['optimize'] = True
+
+    blob = BytesIO()
+    img.save(blob, ext.upper(), **options)
+    return blob.getvalue(), ext
+
+
+def make_derivatives(file, specs=DERIVATIVES) -> dict:
+    """
+    Builds every derivative in specs ({name: RenditionSpec})
+    from a single decode of file.
+    Derivatives with the same spec share one encoded buffer.
+
+    Returns {name: Derivative(file, width, height)}
+    """
+
+    if not file or not specs:
+        return {}
+
+    largest = (
+        max(spec.width for spec in specs.values()),
+        max(spec.height for spec in specs.values()),
+    )
+    img = open_img(file, largest)
+
+    fitted = {}
+    encoded = {}
+    derivatives = {}
+    for name, spec in specs.items():
+        if spec not in encoded:
+            box = (spec.width, spec.height)
+
+            if spec.crop == FILL:
+                out = fill_img(img, *box)
+            else:
+                if box not in fitted:
+                    fitted[box] = fit_img(img, *box)
+
+                out = fitted[box]
+                if spec.crop == SQUARE:
+                    out = square_img(out)
+
+            content, ext = encode_img(out, spec.format, get_quality(spec, spec.format))
+            encoded[spec] = Derivative(ContentFile(content), *out.size, ext)
+
+        derivatives[name] = encoded[spec]
+
+    return derivatives
@@ -1,2 +1,4 @@
 from .indexview import IndexView
 from .pageviews import PageView, SettingPageViewMixin, AboutPage
+from .imageviews import ImageRenditionView
+from .cache import PageCacheMixin
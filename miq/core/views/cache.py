@@ -0,0 +1,134 @@
+"""
+PAGE CACHE
+
+Rendered html of public pages, served to anonymous GET requests.
+
+Enabled with settings.MIQ_PAGE_CACHE = True, entries expire after
+settings.MIQ_PAGE_CACHE_TIMEOUT seconds (default 600), or as soon as the
+content version of the site changes (core/signals.py).
+
+Entries are keyed by path and the query params that change the page
+(settings.MIQ_PAGE_CACHE_QUERY_PARAMS). Tracking params
+(settings.MIQ_PAGE_CACHE_IGNORED_PARAMS) share the entry of the page,
+any other param bypasses the cache.
+"""
+
+import time
+import hashlib
+from fnmatch import fnmatch
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, QueryDict
+from django.utils.http import http_date
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.contrib.sites.shortcuts import get_current_site
+
+from ..cache import get_content_version
+
+
+QUERY_PARAMS = ('page',)
+IGNORED_PARAMS = ('utm_*', 'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref')
+
+
+def get_page_query_params() -> tuple:
+    return getattr(settings, 'MIQ_PAGE_CACHE_QUERY_PARAMS', QUERY_PARAMS)
+
+
+def get_page_cache_params(request):
+    """
+    Sorted (param, values) of the page, None when a param is unknown
+    """
+
+    query_params = get_page_query_params()
+    ignored = getattr(settings, 'MIQ_PAGE_CACHE_IGNORED_PARAMS', IGNORED_PARAMS)
+
+    params = []
+    for param in sorted(request.GET):
+        if param in query_params:
+            params.append((param, request.GET.getlist(param)))
+        elif not any(fnmatch(param, pattern) for pattern in ignored):
+            return None
+    return params
+
+
+def get_canonical_url(request) -> str:
+    """
+    Absolute url of the page with the params that change it only,
+    tracking and unknown params are dropped
+    """
+
+    query_params = get_page_query_params()
+    query = QueryDict(mutable=True)
+    for param in sorted(request.GET):
+        if param in query_params:
+            query.setlist(param, request.GET.getlist(param))
+
+    url = request.build_absolute_uri(request.path)
+    if query:
+        url = f'{url}?{query.urlencode(safe="/")}'
+    return url
+
+
+def get_page_cache_key(request, site_id, version, params) -> str:
+    path = hashlib.md5(f'{request.path}:{params}'.encode()).hexdigest()
+    return f'miq:page:{site_id}:{version}:{path}'
+
+
+class PageCacheMixin:
+    page_cache = True
+
+    def dispatch(self, request, *args, **kwargs):
+        params = get_page_cache_params(request)
+        if params is None or not self.is_page_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        site = get_current_site(request)
+        key = get_page_cache_key(request, site.id, get_content_version(site.id), params)
+        if entry := cache.get(key):
+            return self.get_cached_response(request, entry)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and hasattr(response, 'add_post_render_callback'):
+            # After the middlewares updated the context, and the rendering
+            response.add_post_render_callback(
+                lambda response: self.set_cached_response(request, response, key))
+        return response
+
+    def is_page_cacheable(self, request) -> bool:
+        return self.page_cache \
+            and getattr(settings, 'MIQ_PAGE_CACHE', False) \
+            and request.method == 'GET' \
+            and not request.user.is_authenticated
+
+    def get_cached_response(self, request, entry: dict):
+        response = HttpResponse(entry['content'], content_type=entry['content_type'])
+        response.hit_data = entry['hit_data']
+        self.set_validators(response, entry)
+        return get_conditional_response(
+            request, etag=entry['etag'], last_modified=entry['last_modified'], response=response)
+
+    def set_cached_response(self, request, response, key):
+        # Pages with a csrf token or cookies are specific to the visitor
+        if response.cookies or request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+            return
+
+        hit_data = None
+        if (obj := (response.context_data or {}).get('object')) and hasattr(obj, 'get_hit_data'):
+            hit_data = obj.get_hit_data()
+
+        content = response.content
+        entry = {
+            'content': content,
+            'content_type': response['Content-Type'],
+            'etag': f'"{hashlib.md5(content).hexdigest()}"',
+            'last_modified': int(time.time()),
+            'hit_data': hit_data,
+        }
+        cache.set(key, entry, getattr(settings, 'MIQ_PAGE_CACHE_TIMEOUT', 600))
+        self.set_validators(response, entry)
+
+    def set_validators(self, response, entry: dict):
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        patch_vary_headers(response, ('Cookie',))
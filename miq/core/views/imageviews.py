@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, HttpResponseRedirect
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.contrib.sites.shortcuts import get_current_site
+
+from ..models import Image
+from ..renditions import get_rendition, get_rendition_cache_key
+from ..renditions import get_source_formats, negotiate_format
+
+from .generic import View
+
+
+class ImageRenditionView(View):
+    """
+    Redirects to the stored rendition of an image,
+    generating it on the first request.
+
+    Without a format in the url, the best format
+    accepted by the client is served.
+    """
+
+    def get(self, request, *args, **kwargs):
+        slug = self.kwargs.get('slug')
+        name = self.kwargs.get('spec')
+        ext = self.kwargs.get('format')
+
+        spec = get_rendition(name)
+        if not spec:
+            raise Http404('Rendition not found')
+
+        negotiated = not ext
+        if negotiated:
+            ext = negotiate_format(request.headers.get('Accept'), spec)
+        elif ext not in get_source_formats() and ext != spec.format:
+            raise Http404('Format not available')
+        spec = spec._replace(format=ext)
+
+        # Per site, deleted when the image is deactivated or deleted
+        site = get_current_site(request)
+        key = get_rendition_cache_key(site.id, slug, name, spec)
+        url = cache.get(key)
+        if not url:
+            image = get_object_or_404(
+                Image.objects.active().site(site),
+                slug=slug)
+            url = image.get_rendition(name, ext).src.url
+            cache.set(key, url, getattr(settings, 'MIQ_IMAGE_RENDITION_CACHE_TIMEOUT', 60 * 60 * 24))
+
+        response = HttpResponseRedirect(url)
+        patch_cache_control(response, public=True, max_age=60 * 60)
+        if negotiated:
+            patch_vary_headers(response, ('Accept',))
+        return response
@@ -5,9 +5,10 @@ from django.contrib.sites.shortcuts import get_current_site
 from ..models import Index, Section
 
 from .generic import ListView
+from .cache import PageCacheMixin
 
 
-class IndexView(ListView):
+class IndexView(PageCacheMixin, ListView):
     object = None
     paginate_by = 50
     template_name = 'core/page.html'
@@ -16,7 +17,7 @@ class IndexView(ListView):
         self.object = get_object_or_404(
             Index, site=get_current_site(self.request))
         return Section.objects.order_by('position')\
-            .filter(source=self.object.slug)
+            .filter(source=self.object.slug).for_render()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
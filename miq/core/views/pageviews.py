@@ -3,9 +3,10 @@ from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.contrib.sites.shortcuts import get_current_site
 
-from ..models import Page, SiteSetting
+from ..models import Page, Section, SiteSetting
 
 from .generic import DetailView
+from .cache import PageCacheMixin
 
 
 class SettingPageViewMixin(DetailView):
@@ -63,7 +64,7 @@ class AboutPage(SettingPageViewMixin):
     title = 'About us'
 
 
-class PageView(DetailView):
+class PageView(PageCacheMixin, DetailView):
     model = Page
     template_name = 'core/page.html'
 
@@ -80,5 +81,7 @@ class PageView(DetailView):
         instance = context.get('object')
         if instance:
             context['title'] = instance.title
+            context['sections'] = Section.objects.order_by('position')\
+                .filter(source=instance.slug).for_render()
 
         return context
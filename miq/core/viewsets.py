@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from django.contrib.sites.shortcuts import get_current_site
+
+from rest_framework import status, serializers
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .models import Image
+from .utils import img_files_from_urls
+
+
+class BulkUploadMixin:
+    """
+    POST <images>/bulk/
+    - multipart: src=<file>, src=<file>, ...
+    - json or multipart: src=[<url>, ...] or src=<url>
+    """
+
+    @action(methods=['post'], detail=False, url_path=r'bulk')
+    def bulk(self, request, *args, **kwargs):
+        data = request.data
+        files = request.FILES.getlist('src')
+        urls = data.getlist('src') if hasattr(data, 'getlist') else data.get('src', [])
+        if isinstance(urls, str):
+            urls = [urls]
+        urls = [url for url in urls if isinstance(url, str)]
+
+        max_items = getattr(settings, 'MIQ_IMAGE_BULK_MAX', 50)
+        if not files and not urls:
+            raise serializers.ValidationError({'src': _('No file was submitted.')})
+        if len(files) + len(urls) > max_items:
+            raise serializers.ValidationError(
+                {'src': _('Upload at most %(max)s images at once.') % {'max': max_items}})
+
+        workers = getattr(settings, 'MIQ_IMAGE_BULK_WORKERS', 4)
+        items = [*files, *img_files_from_urls(urls, max_workers=workers)]
+        results = Image.objects.bulk_create_from_files(
+            items, site=get_current_site(request), user=request.user,
+            alt_text=data.get('alt_text', ''))
+
+        created = [img for img, errors in results if img]
+        created_data = iter(self.get_serializer(created, many=True).data)
+
+        items_data = []
+        for index, (img, errors) in enumerate(results):
+            if img:
+                items_data.append({'index': index, 'status': 'created', 'data': next(created_data)})
+            else:
+                items_data.append({
+                    'index': index, 'status': 'error',
+                    'errors': errors or [_('Invalid image url')]
+                })
+
+        response_status = status.HTTP_201_CREATED
+        if not created:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif len(created) < len(results):
+            response_status = status.HTTP_207_MULTI_STATUS
+
+        return Response(
+            {'created': len(created), 'failed': len(results) - len(created), 'results': items_data},
+            status=response_status)
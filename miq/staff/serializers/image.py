@@ -8,7 +8,7 @@ class ImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Image
         read_only_fields = (
-            'user', 'slug', 'name', 'name_truncated',
+            'user', 'slug', 'name', 'name_truncated', 'status',
             'height', 'width', 'size',
             'height_mobile', 'width_mobile', 'size_mobile',
             'height_thumb', 'width_thumb', 'size_thumb',
@@ -3,6 +3,7 @@
 from rest_framework import serializers
 
 from miq.core.models import Section, Image
+from miq.core.serializers import SectionListSerializer
 
 from .image import ImageSerializer
 
@@ -10,6 +11,7 @@ from .image import ImageSerializer
 class SectionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Section
+        list_serializer_class = SectionListSerializer
         read_only_fields = ('slug', 'image', 'images_data',)
         fields = (
             *read_only_fields,
@@ -26,8 +28,6 @@ class SectionSerializer(serializers.ModelSerializer):
     images_data = serializers.SerializerMethodField()
 
     def get_images_data(self, instance):
-        if instance.images.exists():
-            return ImageSerializer(
-                instance.images.order_by('created'), many=True
-            ).data
-        return []
+        # From the prefetched images, sizes are stored columns
+        images = sorted(instance.ordered_images, key=lambda img: img.created)
+        return ImageSerializer(images, many=True).data
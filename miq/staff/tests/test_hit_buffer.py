@@ -0,0 +1,71 @@
+import time
+
+from django.test import TransactionTestCase, override_settings, modify_settings
+
+from miq.analytics.models import Campaign, Hit, SearchTerm
+from miq.analytics.buffer import HitBuffer, get_hit_recorder
+from miq.analytics.utils import HitEntry
+
+from miq.tests.mixins import TestMixin
+
+
+def get_entry(path='/', terms=()):
+    hit = Hit(site_id='1', session='session', url=f'http://testserver{path}', path=path)
+    return HitEntry(hit, [], list(terms))
+
+
+class TestHitBuffer(TestMixin, TransactionTestCase):
+
+    def test_flush(self):
+        buffer = HitBuffer(size=100, interval=60000)
+        for i in range(3):
+            self.assertTrue(buffer.put(get_entry(f'/{i}/', terms=['shoes'])))
+
+        self.assertEqual(Hit.objects.count(), 0)
+        self.assertEqual(buffer.stats()['queued'], 3)
+
+        self.assertEqual(buffer.flush(), 3)
+        self.assertEqual(Hit.objects.count(), 3)
+        self.assertEqual(SearchTerm.objects.get(value='shoes').count, 3)
+        self.assertEqual(buffer.stats(), {'queued': 0, 'flushed': 3, 'dropped': 0})
+
+        buffer.stop()
+
+    def test_max_size(self):
+        buffer = HitBuffer(size=100, interval=60000, max_size=2)
+        results = [buffer.put(get_entry()) for _ in range(3)]
+
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(buffer.dropped, 1)
+
+        buffer.stop()
+        self.assertEqual(Hit.objects.count(), 2)
+
+    def test_flush_on_size(self):
+        buffer = HitBuffer(size=2, interval=60000)
+        buffer.put(get_entry())
+        buffer.put(get_entry())
+
+        for _ in range(50):
+            if Hit.objects.count() == 2:
+                break
+            time.sleep(.05)
+
+        self.assertEqual(Hit.objects.count(), 2)
+        buffer.stop()
+
+
+@modify_settings(MIDDLEWARE={'append': 'miq.analytics.middlewares.AnalyticsMiddleware'})
+@override_settings(MIQ_HIT_RECORDER='miq.analytics.buffer.SyncRecorder')
+class TestSyncRecorder(TestMixin, TransactionTestCase):
+
+    def test_record(self):
+        self.client.get('/?utm_source=News&q=shoes', HTTP_USER_AGENT='Mozilla TEST')
+        self.client.get('/?q=shoes')
+
+        self.assertEqual(Hit.objects.count(), 2)
+        self.assertEqual(Hit.objects.filter(user_agent='mozilla test').count(), 1)
+        self.assertTrue(Campaign.objects.filter(key='utm_source', value='news').exists())
+        self.assertEqual(SearchTerm.objects.get(value='shoes').count, 2)
+
+        self.assertIsNone(get_hit_recorder().flush())
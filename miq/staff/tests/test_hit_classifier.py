@@ -0,0 +1,65 @@
+from django.test import SimpleTestCase, TransactionTestCase
+from django.core.management import call_command
+
+from miq.analytics.models import Hit, TrafficSource
+from miq.analytics.classifier import classify
+
+from miq.tests.mixins import TestMixin
+
+CHROME = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+INSTAGRAM = 'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 Mobile Instagram 300.0'
+GOOGLEBOT = 'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)'
+
+
+class TestClassifier(SimpleTestCase):
+    def test_user_agent(self):
+        self.assertEqual(classify(user_agent=CHROME)['ua_family'], 'chrome')
+        self.assertFalse(classify(user_agent=CHROME)['is_bot'])
+
+        result = classify(user_agent=GOOGLEBOT)
+        self.assertTrue(result['is_bot'])
+        self.assertEqual(result['ua_family'], 'googlebot')
+
+        self.assertTrue(classify(user_agent='curl/8.0')['is_bot'])
+        self.assertTrue(classify(user_agent='')['is_bot'])
+        self.assertTrue(classify(path='/robots.txt', user_agent=CHROME)['is_bot'])
+
+    def test_traffic_source(self):
+        url = 'https://shop.test/'
+
+        def source(referrer, user_agent=CHROME):
+            return classify(url=url, referrer=referrer, user_agent=user_agent)['traffic_source']
+
+        self.assertEqual(source(None), TrafficSource.DIRECT)
+        self.assertEqual(source('https://shop.test/cart/'), TrafficSource.DIRECT)
+        self.assertEqual(source('https://www.google.com/'), TrafficSource.SEARCH)
+        self.assertEqual(source('https://duckduckgo.com/'), TrafficSource.SEARCH)
+        self.assertEqual(source('https://l.instagram.com/'), TrafficSource.SOCIAL)
+        self.assertEqual(source('https://t.co/abc'), TrafficSource.SOCIAL)
+        self.assertEqual(source(None, INSTAGRAM), TrafficSource.SOCIAL)
+        self.assertEqual(source('https://blog.test/post/'), TrafficSource.REFERRAL)
+
+
+class TestHitClassification(TestMixin, TransactionTestCase):
+    def create_hit(self, **kwargs):
+        return Hit.objects.create(site_id='1', url='https://shop.test/', path='/', session='s', **kwargs)
+
+    def test_classified_on_save(self):
+        self.create_hit(user_agent=GOOGLEBOT)
+        self.create_hit(user_agent=INSTAGRAM)
+        self.create_hit(user_agent=CHROME, referrer='https://www.bing.com/')
+
+        self.assertEqual(Hit.objects.all().is_bot().count(), 1)
+        self.assertEqual(Hit.objects.all().is_not_bot().count(), 2)
+        self.assertEqual(Hit.objects.all().social().get().ua_family, 'instagram')
+        self.assertTrue(Hit.objects.filter(traffic_source=TrafficSource.SEARCH).exists())
+
+    def test_classify_hits(self):
+        self.create_hit(user_agent=GOOGLEBOT)
+        self.create_hit(user_agent=CHROME)
+        Hit.objects.update(is_bot=False, ua_family='')
+
+        call_command('classify_hits', batch_size=1, stdout=None)
+
+        self.assertEqual(Hit.objects.all().is_bot().get().ua_family, 'googlebot')
+        self.assertEqual(Hit.objects.all().is_not_bot().get().ua_family, 'chrome')
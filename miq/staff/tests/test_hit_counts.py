@@ -0,0 +1,73 @@
+from collections import Counter
+from unittest import mock
+from datetime import date
+
+from django.db import DataError, connection
+from django.test import TransactionTestCase, modify_settings, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from miq.analytics.models import Campaign, Hit, SearchTerm
+from miq.analytics.utils import HitEntry, upsert_counts, upsert_counts_fallback, write_hits
+
+from miq.tests.mixins import TestMixin
+
+DAY = date(2024, 5, 1)
+
+
+def get_entry(site_id='1', campaigns=(), terms=()):
+    hit = Hit(site_id=site_id, session='session', url='http://testserver/', path='/')
+    return HitEntry(hit, list(campaigns), list(terms))
+
+
+class TestHitCounts(TestMixin, TransactionTestCase):
+
+    def test_upsert_counts(self):
+        fields = ('site_id', 'key', 'value', 'day')
+        with CaptureQueriesContext(connection) as ctx:
+            upsert_counts(Campaign, fields, Counter({('1', 'utm', 'news', DAY): 2, ('2', 'utm', 'news', DAY): 1}))
+        self.assertEqual(len([q for q in ctx.captured_queries if q['sql'].startswith('INSERT')]), 1)
+        upsert_counts(Campaign, fields, Counter({('1', 'utm', 'news', DAY): 3}))
+
+        self.assertEqual(Campaign.objects.count(), 2)
+        self.assertEqual(Campaign.objects.get(site_id='1').count, 5)
+        self.assertEqual(Campaign.objects.get(site_id='2').count, 1)
+
+    def test_upsert_counts_fallback(self):
+        fields = ('site_id', 'value', 'day')
+        upsert_counts_fallback(SearchTerm, fields, Counter({('1', 'shoes', DAY): 2}), 'default')
+        upsert_counts_fallback(SearchTerm, fields, Counter({('1', 'shoes', DAY): 1}), 'default')
+
+        self.assertEqual(SearchTerm.objects.get().count, 3)
+
+    def test_write_hits(self):
+        write_hits([
+            get_entry(campaigns=[('utm_source', 'news')], terms=['shoes']),
+            get_entry(campaigns=[('utm_source', 'news')], terms=['shoes', 'bags']),
+            get_entry(site_id='2', campaigns=[('utm_source', 'news')]),
+        ])
+
+        self.assertEqual(Hit.objects.count(), 3)
+        self.assertEqual(Campaign.objects.get(site_id='1').count, 2)
+        self.assertEqual(Campaign.objects.get(site_id='2').count, 1)
+        self.assertEqual(SearchTerm.objects.get(value='shoes').count, 2)
+        self.assertEqual(SearchTerm.objects.get(value='bags').count, 1)
+
+    def test_write_hits_atomic(self):
+        # A failed count upsert (too long on postgres) saves no hit either
+        with mock.patch('miq.analytics.utils.upsert_counts', side_effect=DataError):
+            with self.assertRaises(DataError):
+                write_hits([get_entry(), get_entry(campaigns=[('gclid', 'x' * 150)])])
+        self.assertEqual(Hit.objects.count(), 0)
+
+
+@modify_settings(MIDDLEWARE={'append': 'miq.analytics.middlewares.AnalyticsMiddleware'})
+@override_settings(MIQ_HIT_RECORDER='miq.analytics.buffer.SyncRecorder')
+class TestLongValues(TestMixin, TransactionTestCase):
+    def test_truncated(self):
+        long = 'x' * 150
+        self.client.get(f'/?gclid={long}&{long}=1&q={long}')
+
+        self.assertEqual(Hit.objects.count(), 1)
+        self.assertEqual(Campaign.objects.get(key='gclid').value, 'x' * 99)
+        self.assertEqual(Campaign.objects.get(value='1').key, 'x' * 99)
+        self.assertEqual(SearchTerm.objects.get().value, 'x' * 99)
@@ -0,0 +1,73 @@
+from unittest import mock
+
+from django.urls import reverse_lazy
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+
+from miq.analytics.models import Campaign, Hit
+from miq.analytics.viewsets import HitPagination
+
+from miq.tests.mixins import TestMixin
+
+hits_path = reverse_lazy('miqanalytics:hit-list')
+campaigns_path = reverse_lazy('miqanalytics:campaign-list')
+
+
+@mock.patch.object(HitPagination, 'page_size', 10)
+class TestKeysetPagination(TestMixin, APITransactionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = self.create_superuser(self.username, self.password)
+        self.client.login(username=self.username, password=self.password)
+
+        Hit.objects.bulk_create([
+            Hit(site_id='1', session='s', url=f'http://testserver/{i}/', path=f'/{i}/')
+            for i in range(25)
+        ])
+        # Ties on created are ordered by id
+        Hit.objects.filter(pk__in=Hit.objects.order_by('pk').values('pk')[5:15])\
+            .update(created=timezone.now())
+
+    def walk(self, url, link='has_next_url'):
+        pages = []
+        while url:
+            r = self.client.get(url)
+            self.assertEqual(r.status_code, status.HTTP_200_OK)
+            self.assertTrue(r.data['is_drf'])
+            pages.append([hit['slug'] for hit in r.data['results']])
+            url = r.data[link]
+        return pages, r.data
+
+    def test_pages(self):
+        pages, last = self.walk(hits_path)
+
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        slugs = [slug for page in pages for slug in page]
+        self.assertEqual(len(set(slugs)), 25)
+
+        expected = Hit.objects.order_by('-created', '-id').values_list('slug', flat=True)
+        self.assertEqual(slugs, [str(slug) for slug in expected])
+        self.assertFalse(last['has_next'])
+        self.assertNotIn('count', last)
+
+        # Back to the first page
+        back, first = self.walk(last['has_previous_url'], 'has_previous_url')
+        self.assertEqual(back, [pages[1], pages[0]])
+        self.assertFalse(first['has_previous'])
+
+    def test_invalid_cursor(self):
+        r = self.client.get(hits_path, {'cursor': 'nope'})
+        self.assertEqual(r.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_campaigns(self):
+        for i in range(12):
+            Campaign.objects.create(key='utm', value=f'{i}', is_pinned=i < 3)
+
+        pages, last = self.walk(campaigns_path)
+        self.assertEqual(sum(len(page) for page in pages), 12)
+
+        r = self.client.get(campaigns_path, {'summary': '1'})
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(r.data['results']), 12)
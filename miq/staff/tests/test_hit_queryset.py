@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from miq.analytics.models import Hit
+
+from miq.tests.mixins import TestMixin
+
+
+class TestHitQueryset(TestMixin, TransactionTestCase):
+    def create_hit(self, created):
+        hit = Hit.objects.create(site_id='1', url='https://shop.test/', path='/', session='s')
+        Hit.objects.filter(pk=hit.pk).update(created=created)
+        return hit
+
+    def test_today_yesterday(self):
+        now = timezone.now()
+        today = self.create_hit(now)
+        yesterday = self.create_hit(now - timedelta(days=1))
+        self.create_hit(now - timedelta(days=3))
+
+        self.assertEqual(list(Hit.objects.all().today()), [today])
+        self.assertEqual(list(Hit.objects.all().yesterday()), [yesterday])
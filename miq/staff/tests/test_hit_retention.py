@@ -0,0 +1,66 @@
+import os
+import gzip
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.utils import timezone
+from django.test import TransactionTestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from miq.analytics.models import DailyHitRollup, Hit
+from miq.analytics.retention import get_archive_path
+
+from miq.tests.mixins import TestMixin
+
+
+def create_hit(days_ago=0, path='/'):
+    hit = Hit.objects.create(
+        site_id='1', session='s', url=f'http://testserver{path}', path=path, user_agent='mozilla')
+    Hit.objects.filter(pk=hit.pk).update(created=timezone.now() - timedelta(days=days_ago))
+    return hit
+
+
+class TestPruneHits(TestMixin, TransactionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.archive_dir = tempfile.mkdtemp()
+
+        create_hit(100)
+        create_hit(100, '/shop/')
+        create_hit(95)
+        self.kept = create_hit(1)
+
+    def tearDown(self):
+        shutil.rmtree(self.archive_dir, ignore_errors=True)
+
+    def test_prune(self):
+        call_command('prune_hits', days=90, archive_dir=self.archive_dir, batch_size=1, stdout=None)
+
+        self.assertEqual(list(Hit.objects.values_list('pk', flat=True)), [self.kept.pk])
+
+        old_day = timezone.localdate() - timedelta(days=100)
+        self.assertEqual(DailyHitRollup.objects.filter(day=old_day).summary()['count'], 2)
+
+        path = get_archive_path(self.archive_dir, old_day)
+        with gzip.open(path, 'rt') as file:
+            rows = [json.loads(line) for line in file]
+        self.assertEqual(sorted(row['path'] for row in rows), ['/', '/shop/'])
+
+        # Rollups of pruned days are not rebuilt from the missing hits
+        call_command('rollup_hits', since=old_day, stdout=None)
+        self.assertEqual(DailyHitRollup.objects.filter(day=old_day).summary()['count'], 2)
+
+    def test_dry_run(self):
+        call_command('prune_hits', days=90, archive_dir=self.archive_dir, dry_run=True, stdout=None)
+        self.assertEqual(Hit.objects.count(), 4)
+
+    def test_archive_required(self):
+        with self.assertRaises(CommandError):
+            call_command('prune_hits', days=90, stdout=None)
+
+        call_command('prune_hits', days=90, no_archive=True, stdout=None)
+        self.assertEqual(Hit.objects.count(), 1)
+        self.assertFalse(os.listdir(self.archive_dir))
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.urls import reverse_lazy
+from django.utils import timezone
+from django.core.management import call_command
+
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+
+from miq.analytics.models import DailyHitRollup, Hit, HitRollup
+
+from miq.tests.mixins import TestMixin
+
+summary_path = reverse_lazy('miqanalytics:hit-summary')
+timeseries_path = reverse_lazy('miqanalytics:hit-timeseries')
+
+
+def create_hit(path='/', session='s1', user_agent='mozilla', **kwargs):
+    return Hit.objects.create(
+        site_id='1', url=f'http://testserver{path}', path=path,
+        session=session, user_agent=user_agent, response_status=200, **kwargs)
+
+
+class TestHitRollups(TestMixin, APITransactionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = self.create_superuser(self.username, self.password)
+        self.client.login(username=self.username, password=self.password)
+
+        create_hit('/', 's1')
+        create_hit('/', 's1')
+        create_hit('/', 's2')
+        create_hit('/shop/', 's2')
+        create_hit('/', 's3', user_agent='googlebot')
+        create_hit('/admin/', 's1')
+
+        yst = create_hit('/', 's4')
+        Hit.objects.filter(pk=yst.pk).update(created=timezone.now() - timedelta(days=1))
+
+    def test_rollup(self):
+        call_command('rollup_hits', stdout=None)
+
+        today = timezone.localdate()
+        home = DailyHitRollup.objects.get(day=today, path='/', is_bot=False)
+        self.assertEqual((home.hits, home.sessions), (3, 2))
+        self.assertFalse(DailyHitRollup.objects.filter(path='/admin/').exists())
+        self.assertEqual(DailyHitRollup.objects.filter(day=today).summary(), {'count': 4, 'bots': 1})
+        self.assertEqual(HitRollup.objects.filter(is_bot=False).summary()['count'], 5)
+
+        # Rebuilding is idempotent
+        create_hit('/', 's5')
+        call_command('rollup_hits', stdout=None)
+        self.assertEqual(DailyHitRollup.objects.filter(day=today).summary(), {'count': 5, 'bots': 1})
+        self.assertEqual(DailyHitRollup.objects.filter(day=today - timedelta(days=1)).summary()['count'], 1)
+
+    def test_summary(self):
+        call_command('rollup_hits', stdout=None)
+
+        r = self.client.get(summary_path)
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertEqual(r.data['today'], {'count': 4, 'bots': 1})
+        self.assertEqual(r.data['yesterday'], {'count': 1, 'bots': 0})
+
+    def test_timeseries(self):
+        call_command('rollup_hits', stdout=None)
+
+        r = self.client.get(timeseries_path, {'days': 7})
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['count'] for row in r.data], [1, 4])
+        self.assertEqual(r.data[-1]['day'], timezone.localdate())
+
+        r = self.client.get(timeseries_path, {'unit': 'hour', 'path': '/shop/'})
+        self.assertEqual(sum(row['count'] for row in r.data), 1)
+
+        r = self.client.get(timeseries_path, {'days': 'all'})
+        self.assertEqual(r.status_code, status.HTTP_400_BAD_REQUEST)
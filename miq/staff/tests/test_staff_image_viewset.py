@@ -0,0 +1,77 @@
+import shutil
+from unittest import mock
+
+from django.urls import reverse_lazy
+from django.test import override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+
+from miq.core.models import Image, ImageStatus
+
+from miq.tests.mixins import TestMixin
+from miq.tests.utils import get_temp_img
+
+TEST_MEDIA_DIR = 'test_media'
+bulk_path = reverse_lazy('staff:staffimage-bulk')
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_DIR, MIQ_IMAGE_PIPELINE='miq.core.pipeline.QueuePipeline')
+class TestStaffImageBulk(TestMixin, APITransactionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = self.create_staffuser(self.username, self.password)
+        self.client.login(username=self.username, password=self.password)
+
+    def tearDown(self):
+        try:
+            shutil.rmtree(TEST_MEDIA_DIR)
+        except Exception:
+            pass
+
+    def test_files(self):
+        files = [get_temp_img(), get_temp_img(size=80), SimpleUploadedFile('notes.txt', b'not an image')]
+
+        r = self.client.post(bulk_path, {'src': files, 'alt_text': 'Gallery'}, format='multipart')
+        self.assertEqual(r.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual((r.data['created'], r.data['failed']), (2, 1))
+
+        results = r.data['results']
+        self.assertEqual([item['status'] for item in results], ['created', 'created', 'error'])
+        self.assertEqual(results[1]['data']['width'], 80)
+        self.assertTrue(results[2]['errors'])
+
+        qs = Image.objects.filter(user=self.user, site=self.site)
+        self.assertEqual(qs.count(), 2)
+        self.assertEqual(qs.pending().count(), 2)
+        self.assertEqual(qs.first().alt_text, 'Gallery')
+
+    def test_urls(self):
+        downloads = [get_temp_img(), None]
+        with mock.patch('miq.core.viewsets.img_files_from_urls', return_value=downloads) as fetch:
+            r = self.client.post(
+                bulk_path, {'src': ['http://img/1.jpg', 'http://img/2.jpg']}, format='json')
+
+        fetch.assert_called_once()
+        self.assertEqual(r.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(r.data['results'][0]['data']['status'], ImageStatus.PENDING)
+        self.assertEqual(r.data['results'][1]['status'], 'error')
+
+    def test_single_url(self):
+        with mock.patch('miq.core.viewsets.img_files_from_urls', return_value=[get_temp_img()]) as fetch:
+            with self.settings(MIQ_IMAGE_BULK_MAX=1):
+                r = self.client.post(bulk_path, {'src': 'http://img/1.jpg'}, format='json')
+
+        self.assertEqual(fetch.call_args.args[0], ['http://img/1.jpg'])
+        self.assertEqual(r.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(r.data['created'], 1)
+
+    def test_limits(self):
+        r = self.client.post(bulk_path, {}, format='json')
+        self.assertEqual(r.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with self.settings(MIQ_IMAGE_BULK_MAX=1):
+            r = self.client.post(bulk_path, {'src': [get_temp_img(), get_temp_img()]}, format='multipart')
+        self.assertEqual(r.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Image.objects.exists())
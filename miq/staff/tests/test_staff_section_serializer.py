@@ -0,0 +1,46 @@
+import shutil
+
+from django.test import TransactionTestCase, override_settings
+
+from miq.core.models import Image, Section, SectionType
+from miq.staff.serializers import SectionSerializer
+
+from miq.tests.mixins import TestMixin
+from miq.tests.utils import get_temp_img
+
+TEST_MEDIA_DIR = 'test_media'
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_DIR, MIQ_IMAGE_PIPELINE='miq.core.pipeline.QueuePipeline')
+class TestSectionSerializer(TestMixin, TransactionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        user = self.get_user()
+        site = self.site
+        images = [
+            Image.objects.create(site=site, user=user, src=get_temp_img(), position=position)
+            for position in (2, 1)
+        ]
+        for i in range(30):
+            section = Section.objects.create(site=site, type=SectionType.IMG, position=i)
+            section.images.add(*images)
+
+    def tearDown(self):
+        shutil.rmtree(TEST_MEDIA_DIR, ignore_errors=True)
+
+    def test_list(self):
+        # Sections, then every image in one query
+        with self.assertMaxQueries(2):
+            data = SectionSerializer(Section.objects.prefetch_related(None), many=True).data
+
+        self.assertEqual(len(data), 30)
+        self.assertEqual(len(data[0]['images_data']), 2)
+        self.assertEqual(len(data[0]['images']), 2)
+        self.assertTrue(data[0]['images_data'][0]['width'])
+
+    def test_detail(self):
+        section = Section.objects.prefetch_related(None).first()
+        data = SectionSerializer(section).data
+
+        self.assertEqual(len(data['images_data']), 2)
+        self.assertEqual(data['image']['position'], 1)
@@ -43,9 +43,9 @@ class IndexView(LoginRequiredMixin, TemplateView):
         if apps.is_installed('miq_hrm'):
             Employee = apps.get_model('miq_hrm', 'Employee')
 
-            employee = Employee.objects.filter(user=self.request.user)
-            if employee.exists():
-                employee = employee.first()
+            employee = Employee.objects.select_related('company')\
+                .filter(user=self.request.user).first()
+            if employee:
                 data['user']['employee'] = employee.to_dict()
 
                 company = employee.company
@@ -3,12 +3,13 @@ from django.utils.translation import gettext_lazy as _
 from django.contrib.sites.shortcuts import get_current_site
 
 from rest_framework.response import Response
+from rest_framework.decorators import action
 from rest_framework import viewsets, status, serializers
 from rest_framework.parsers import JSONParser, MultiPartParser
 
 from miq.core.models import Image
-from miq.core.utils import get_file_ext
-from miq.core.utils import download_img_from_url, img_file_from_response
+from miq.core.utils import download_img_file
+from miq.core.viewsets import BulkUploadMixin
 
 from ..mixins import LoginRequiredMixin
 from ..serializers import ImageSerializer
@@ -18,7 +19,7 @@ IMAGE
 """
 
 
-class ImageViewset(LoginRequiredMixin, viewsets.ModelViewSet):
+class ImageViewset(BulkUploadMixin, LoginRequiredMixin, viewsets.ModelViewSet):
     lookup_field = 'slug'
     queryset = Image.objects.none()
     parser_classes = (JSONParser, MultiPartParser)
@@ -29,15 +30,15 @@ class ImageViewset(LoginRequiredMixin, viewsets.ModelViewSet):
         data = request.data
         src = data.get('src')
         if isinstance(src, str):
-            res = download_img_from_url(src)
-            if not res:
+            file = download_img_file(src)
+            if not file:
                 raise serializers.ValidationError(
                     {'submit': _('Invalid action')})
 
             serializer = self.get_serializer(
                 data={
                     'alt_text': data.get('alt_text', ''),
-                    'src': img_file_from_response(res, None, get_file_ext(src))
+                    'src': file
                 }
             )
 
@@ -50,6 +51,20 @@ class ImageViewset(LoginRequiredMixin, viewsets.ModelViewSet):
 
         return super().create(request, *args, **kwargs)
 
+    @action(methods=['post'], detail=True, url_path=r'retry')
+    def retry(self, request, *args, **kwargs):
+        """
+        Regenerate the derivatives of a failed image
+        """
+
+        instance = self.get_object()
+        if instance.is_ready:
+            raise serializers.ValidationError(
+                {'status': _('Image already processed')})
+
+        instance.retry()
+        return Response(self.get_serializer(instance).data)
+
     def get_queryset(self):
         qs = Image.objects.all().site(get_current_site(self.request))
         return qs
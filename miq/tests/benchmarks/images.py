@@ -0,0 +1,83 @@
+"""
+Compares the legacy derivative path (get_thumbnail + crop_img_to_square)
+with the single decode engine (make_derivatives).
+
+python -m miq.tests.benchmarks.images [--size 4000x3000] [--rounds 5]
+"""
+
+import argparse
+import resource
+import time
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image as PImage, ImageDraw
+
+
+def make_jpeg(width, height):
+    img = PImage.effect_mandelbrot((width, height), (-2, -1.5, 1, 1.5), 100)
+    img = PImage.merge('RGB', (img, img.rotate(90, expand=False), img.transpose(PImage.FLIP_LEFT_RIGHT)))
+    draw = ImageDraw.Draw(img)
+    for i in range(0, width, 40):
+        draw.line((i, 0, width - i, height), fill=(i % 255, 90, 160), width=3)
+
+    blob = BytesIO()
+    img.save(blob, 'JPEG', quality=90)
+    return blob.getvalue()
+
+
+def legacy(data):
+    from miq.core.utils import img_file_from_pil
+    from miq.core.utils_img import get_thumbnail, crop_img_to_square
+
+    # src_mobile and thumb each get their own encode
+    thumb = get_thumbnail(file=BytesIO(data))
+    src_mobile = img_file_from_pil(thumb)
+    thumb_file = img_file_from_pil(thumb)
+
+    # thumb_sq is built by decoding the stored thumb again
+    thumb_sq = img_file_from_pil(crop_img_to_square(file=BytesIO(thumb_file.file.getvalue())))
+    return [src_mobile, thumb_file, thumb_sq]
+
+
+def engine(data):
+    from miq.core.utils_img import make_derivatives
+
+    return make_derivatives(BytesIO(data))
+
+
+PATHS = {'legacy': legacy, 'engine': engine}
+
+
+def run(path, data, rounds):
+    func = PATHS[path]
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(data)
+    elapsed = (time.perf_counter() - start) / rounds
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', default='4000x3000')
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    width, height = [int(v) for v in args.size.split('x')]
+    data = make_jpeg(width, height)
+    print(f'Source: {width}x{height} JPEG, {len(data) / 1024:.0f} KB, {args.rounds} rounds\n')
+
+    for path in PATHS:
+        # Fresh process per path so peak memory is not shared
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            elapsed, peak = executor.submit(run, path, data, args.rounds).result()
+        print(f'{path:>8}: {elapsed * 1000:8.1f} ms/image   peak +{peak / 1024:7.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
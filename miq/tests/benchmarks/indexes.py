@@ -0,0 +1,148 @@
+"""
+Times the hot Hit, Section and Image lookups on a seeded test database,
+with the model indexes and again after dropping them.
+
+DJANGO_SETTINGS_MODULE=<settings> python -m miq.tests.benchmarks.indexes [--hits 200000] [--rounds 20] [--explain]
+
+Run it against the database engine used in production (postgres), sqlite
+plans differ.
+"""
+
+import argparse
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+import django
+
+
+def timeit(func, rounds):
+    func()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds
+
+
+@contextmanager
+def manual_created(*models):
+    # created is auto_now_add, seeded rows need their own dates
+    fields = [model._meta.get_field('created') for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def seed(hits, batch_size=5000):
+    from django.utils import timezone
+    from django.contrib.sites.models import Site
+    from django.contrib.auth import get_user_model
+
+    from miq.analytics.models import Hit
+    from miq.core.models import Image, Section
+
+    now = timezone.now()
+    sites = [Site.objects.get_or_create(domain=f'site{i}.test', name=f'site{i}')[0] for i in range(3)]
+    users = [get_user_model().objects.create(username=f'bench{i}') for i in range(20)]
+
+    with manual_created(Hit, Image, Section):
+        rows = []
+        for i in range(hits):
+            rows.append(Hit(
+                site_id=str(random.choice(sites).id), session=f's{random.randrange(hits // 20)}',
+                url='https://site.test/', path=f'/page-{random.randrange(500)}/',
+                is_bot=random.random() < .3,
+                created=now - timedelta(seconds=random.randrange(90 * 24 * 3600))))
+            if len(rows) == batch_size:
+                Hit.objects.bulk_create(rows)
+                rows = []
+        Hit.objects.bulk_create(rows)
+
+        Image.objects.bulk_create([
+            Image(
+                site=random.choice(sites), user=random.choice(users),
+                is_active=random.random() < .8, position=random.randrange(100), created=now)
+            for i in range(hits // 10)], batch_size=batch_size)
+
+        Section.objects.bulk_create([
+            Section(
+                site=random.choice(sites), source=f'page-{i % 2000}',
+                position=random.randrange(50), created=now)
+            for i in range(hits // 10)], batch_size=batch_size)
+
+    return {'site_id': str(sites[0].id), 'source': 'page-1', 'user': users[0]}
+
+
+def get_lookups(params):
+    from miq.analytics.models import Hit
+    from miq.core.models import Image, Section
+
+    return {
+        'Hit today()': lambda: Hit.objects.all().today()[:100],
+        'Hit yesterday()': lambda: Hit.objects.all().yesterday(),
+        'Hit by site, latest': lambda: Hit.objects.filter(site_id=params['site_id']).order_by('-created')[:100],
+        'Hit humans, latest': lambda: Hit.objects.all().is_not_bot().order_by('-created')[:100],
+        'Section by source': lambda: Section.objects.filter(source=params['source']).order_by('position').values_list('pk'),
+        'Image.objects.user()': lambda: Image.objects.user(params['user']).values_list('pk')[:50],
+    }
+
+
+def get_indexes():
+    from miq.analytics.models import Hit
+    from miq.core.models import Image, Section
+
+    return [(model, index) for model in (Hit, Image, Section) for index in model._meta.indexes]
+
+
+def run(lookups, rounds, explain=False):
+    results = {}
+    for name, lookup in lookups.items():
+        if explain:
+            print(f'{name}\n{lookup().explain()}\n')
+        results[name] = timeit(lambda: list(lookup()), rounds)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--hits', type=int, default=200000)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--explain', action='store_true')
+    args = parser.parse_args()
+
+    django.setup()
+
+    from django.db import connection
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        print(f'Seeding {args.hits} hits on {connection.vendor}...')
+        params = seed(args.hits)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        lookups = get_lookups(params)
+        indexed = run(lookups, args.rounds, args.explain)
+
+        with connection.schema_editor() as editor:
+            for model, index in get_indexes():
+                editor.remove_index(model, index)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        bare = run(lookups, args.rounds, args.explain)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(f'\n{"lookup":<26} {"no index":>10} {"indexed":>10}')
+    for name in lookups:
+        print(f'{name:<26} {bare[name] * 1000:8.2f}ms {indexed[name] * 1000:8.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Render throughput of sections, per section type, and of images, on a
+seeded test database. Also compares compiling inline templates on each
+call (legacy) with the compiled template cache.
+
+DJANGO_SETTINGS_MODULE=<settings> python -m miq.tests.benchmarks.render [--rounds 2000] [--images 6]
+"""
+
+import argparse
+import time
+
+import django
+
+
+def timeit(func, rounds):
+    func()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds
+
+
+def seed(images):
+    from django.contrib.sites.models import Site
+    from django.contrib.auth import get_user_model
+
+    from miq.core.models import Image, Section, SectionType
+
+    site = Site.objects.get_or_create(domain='bench.test', name='bench')[0]
+    user = get_user_model().objects.create(username='bench')
+    imgs = Image.objects.bulk_create([
+        Image(site=site, user=user, src=f'bench/{i}.jpg', src_mobile=f'bench/{i}-mobile.jpg', position=i)
+        for i in range(images)])
+
+    sections = []
+    for type in SectionType:
+        section = Section.objects.create(site=site, type=type, html='<p>Text</p>', source='bench')
+        section.images.set(imgs)
+        sections.append(section)
+
+    return list(Section.objects.filter(source='bench')), imgs[0]
+
+
+def legacy_inline(source, context):
+    from django.template import Context, Template
+
+    return Template(source).render(Context(context))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rounds', type=int, default=2000)
+    parser.add_argument('--images', type=int, default=6)
+    args = parser.parse_args()
+
+    django.setup()
+
+    from django.db import connection
+
+    from miq.core.mixins import render_template
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        sections, image = seed(args.images)
+
+        print(f'{args.rounds} rounds, {args.images} images per section\n')
+        for section in sections:
+            elapsed = timeit(section.render, args.rounds)
+            print(f'Section {section.type:<8} {1 / elapsed:10.0f} renders/s')
+
+        for name in ('render', 'render_thumb_sq'):
+            elapsed = timeit(getattr(image, name), args.rounds)
+            print(f'Image.{name:<16} {1 / elapsed:7.0f} renders/s')
+
+        source = '<div class="{{ type }}">{% for image in images %}<img src="{{ image.src.url }}">{% endfor %}</div>'
+        context = {'type': 'bench', 'images': sections[0].ordered_images}
+        print()
+        for name, func in (('legacy', legacy_inline), ('cached', render_template)):
+            elapsed = timeit(lambda: func(source, context), args.rounds)
+            print(f'Inline {name:<9} {1 / elapsed:10.0f} renders/s')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,6 @@
+from contextlib import contextmanager
+
+from django.core.cache import cache
 from django.contrib.sites.models import Site
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
@@ -79,5 +82,36 @@ class SiteMixin:
         return Site.objects.create()
 
 
-class TestMixin(SiteMixin, UserMixin):
-    pass
+class QueryBudgetMixin:
+    """
+    Fails when a block runs more queries than its budget
+
+    with self.assertMaxQueries(5):
+        self.client.get(path)
+
+    r = self.assertQueryBudget(3, self.client.get, path)
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, budget: int, *, duplicates: bool = True, using: str = 'default'):
+        from miq.core.queries import QueryRecorder
+
+        with QueryRecorder(using) as recorder:
+            yield recorder
+
+        if recorder.count > budget:
+            self.fail(f'Query budget of {budget} exceeded: {recorder.get_report()}')
+
+        if not duplicates and recorder.duplicates:
+            self.fail(f'Duplicated queries: {recorder.get_report()}')
+
+    def assertQueryBudget(self, budget: int, func, *args, **kwargs):
+        with self.assertMaxQueries(budget):
+            return func(*args, **kwargs)
+
+
+class TestMixin(SiteMixin, UserMixin, QueryBudgetMixin):
+    def setUp(self):
+        # Cached data does not roll back with test transactions
+        cache.clear()
+        super().setUp()